@@ -0,0 +1,69 @@
+"""
+Подпись и проверка JWT в секунду для каждого алгоритма: с PEM-строкой, как PyJWT получал ключи раньше,
+и с ключами, разобранными один раз в JWTKeys.
+
+Кэш проверенных токенов отключен, каждая проверка считает подпись заново.
+Помогает выбрать ALGORITHM по измеренной пропускной способности.
+
+Запуск: python -m benchmarks.jwt_algorithms [--tokens 2000]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from jwt import decode as jwt_decode, encode as jwt_encode
+
+from src.config import auth_jwt
+from src.services import LRUCache, TokenService
+
+from .token_decode import pem_keys
+
+ALGORITHMS = ("HS256", "RS256", "ES256", "EdDSA")
+
+
+def rate(count: int, start: float) -> float:
+    return count / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"tokens={args.tokens}")
+    print(f"{'':6} {'sign pem':>10} {'sign parsed':>12} {'verify pem':>11} {'verify parsed':>14}  tokens/s")
+    for algorithm in ALGORITHMS:
+        auth_jwt.ALGORITHM = algorithm
+        auth_jwt.PRIVATE_JWT, auth_jwt.PUBLIC_JWT = pem_keys(algorithm)
+        token_service = TokenService(cache=LRUCache(maxsize=0))
+        token_service.keys.load()
+
+        payloads = [{"sub": str(uuid4()), "exp": datetime.now(timezone.utc) + timedelta(minutes=15)}
+                    for _ in range(args.tokens)]
+
+        start = time.perf_counter()
+        for payload in payloads:
+            jwt_encode(payload, auth_jwt.PRIVATE_JWT, algorithm=algorithm)
+        sign_pem = rate(args.tokens, start)
+
+        start = time.perf_counter()
+        tokens = [await token_service.create_token(payload, payload["exp"]) for payload in payloads]
+        sign_parsed = rate(args.tokens, start)
+
+        start = time.perf_counter()
+        for token in tokens:
+            jwt_decode(token, auth_jwt.PUBLIC_JWT, algorithms=[algorithm])
+        verify_pem = rate(args.tokens, start)
+
+        start = time.perf_counter()
+        for token in tokens:
+            await token_service.decode_token(token)
+        verify_parsed = rate(args.tokens, start)
+
+        print(f"{algorithm:6} {sign_pem:10.0f} {sign_parsed:12.0f} {verify_pem:11.0f} {verify_parsed:14.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
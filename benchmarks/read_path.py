@@ -0,0 +1,135 @@
+"""
+Сравнение чтения списков через ORM-сущности и через Core select() по колонкам (src/repositories/rows.py).
+
+Для каждого размера страницы выводится среднее время вызова и пик выделенной памяти (tracemalloc).
+По умолчанию используется SQLite в памяти (нужен пакет aiosqlite). Для замера на PostgreSQL
+передайте --url с пустой тестовой базой: в ней будут созданы таблицы и тестовые данные.
+
+Запуск: python -m benchmarks.read_path [--url URL] [--rows 5000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn, CreateIndex
+
+from src.repositories import ArticleRepository, Base, User, UserRepository
+from src.repositories import Article as ArticleModel
+from src.schemas import Article, ArticlePage, UserOut
+
+
+@compiles(CreateColumn, "sqlite")
+def _skip_search_vector_column(element, compiler, **kw):
+    if element.element.name == "search_vector":
+        return None
+    return compiler.visit_create_column(element, **kw)
+
+
+@compiles(CreateIndex, "sqlite")
+def _skip_search_vector_index(element, compiler, **kw):
+    if any(column.name == "search_vector" for column in element.element.columns):
+        return "SELECT 1"
+    return compiler.visit_create_index(element, **kw)
+
+
+async def orm_articles(session: AsyncSession, limit: int) -> ArticlePage:
+    """Прежний путь: ORM-сущности, затем валидация схемы через from_attributes"""
+    stmt = select(ArticleModel).order_by(ArticleModel.created_at.desc(), ArticleModel.id.desc()).limit(limit)
+    articles = (await session.execute(stmt)).scalars().all()
+    return ArticlePage(items=[Article.model_validate(article) for article in articles])
+
+
+async def core_articles(session: AsyncSession, limit: int) -> ArticlePage:
+    return await ArticleRepository().get_articles(session, limit=limit)
+
+
+async def orm_users(session: AsyncSession, limit: int) -> list[UserOut]:
+    """Прежний путь get_users: все пользователи как ORM-сущности, затем валидация схемы"""
+    users = (await session.execute(select(User).order_by(User.uuid))).scalars().all()
+    return [UserOut.model_validate(user) for user in users]
+
+
+async def core_users(session: AsyncSession, limit: int) -> list[UserOut]:
+    return await UserRepository().get_users(session)
+
+
+async def populate(session_factory: async_sessionmaker, rows: int) -> None:
+    now = datetime.now()
+    async with session_factory() as session:
+        users = [User(name=f"bench{i}", email=f"bench{i}@example.com", password_hash="x") for i in range(rows // 10)]
+        session.add_all(users)
+        await session.flush()
+        await session.execute(
+            insert(ArticleModel.__table__),
+            [
+                {
+                    "title": f"Article {i}",
+                    "text": "Lorem ipsum dolor sit amet " * 20,
+                    "author_id": users[i % len(users)].uuid,
+                    "rating": i % 50 / 10,
+                    "created_at": now - timedelta(minutes=i),
+                    "version": 1,
+                }
+                for i in range(rows)
+            ],
+        )
+        await session.commit()
+
+
+async def measure(session_factory: async_sessionmaker, read, limit: int, repeat: int) -> tuple[float, float]:
+    """
+    Возвращает среднее время вызова в мс и пик выделенной за вызов памяти в КиБ.
+    Время измеряется без tracemalloc, память - отдельным вызовом под tracemalloc.
+    """
+    async with session_factory() as session:
+        await read(session, limit)
+
+    elapsed = 0.0
+    for _ in range(repeat):
+        async with session_factory() as session:
+            start = time.perf_counter()
+            await read(session, limit)
+            elapsed += time.perf_counter() - start
+
+    async with session_factory() as session:
+        tracemalloc.start()
+        await read(session, limit)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return elapsed / repeat * 1000, peak / 1024
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="sqlite+aiosqlite://")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await populate(session_factory, args.rows)
+
+        print(f"articles={args.rows} users={args.rows // 10} repeat={args.repeat}")
+        cases = [("articles", limit, orm_articles, core_articles) for limit in (20, 100, 1000)]
+        cases.append(("users", args.rows // 10, orm_users, core_users))
+        for name, limit, orm_read, core_read in cases:
+            orm_ms, orm_kib = await measure(session_factory, orm_read, limit, args.repeat)
+            core_ms, core_kib = await measure(session_factory, core_read, limit, args.repeat)
+            print(f"{name:<8} rows={limit:<5} orm {orm_ms:8.2f} ms {orm_kib:9.1f} KiB   "
+                  f"core {core_ms:8.2f} ms {core_kib:9.1f} KiB   x{orm_ms / core_ms:.1f} time x{orm_kib / core_kib:.1f} memory")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Сравнение сериализации ответов со статьями: стандартный путь FastAPI (валидация по
+response_model, сериализация в Python-объекты и json.dumps) и FastJSONResponse.
+
+Запуск: python -m benchmarks.serialization [--rows 1000] [--repeat 50]
+"""
+import argparse
+import asyncio
+import json
+import timeit
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.repositories import Article as ArticleModel
+from src.routing.responses import FastJSONResponse
+from src.schemas import Article, ArticlePage
+
+
+def make_rows(count: int) -> list[ArticleModel]:
+    """Создает ORM-объекты статей, как их возвращает сессия"""
+    now = datetime.now()
+    return [
+        ArticleModel(
+            id=i,
+            title=f"Article {i}",
+            text="Lorem ipsum dolor sit amet " * 20,
+            author_id=uuid4(),
+            rating=round(i % 50 / 10, 1),
+            created_at=now - timedelta(minutes=i),
+            updated_at=None,
+            version=1,
+        )
+        for i in range(count)
+    ]
+
+
+loop = asyncio.new_event_loop()
+
+
+def current_path(field, rows) -> bytes:
+    """Путь FastAPI для response_model=list[Article] при возврате ORM-объектов"""
+    content = loop.run_until_complete(serialize_response(field=field, response_content=rows))
+    return JSONResponse(content).body
+
+
+def current_page_path(field, page: ArticlePage) -> bytes:
+    """Путь FastAPI для response_model=ArticlePage при возврате уже провалидированной страницы"""
+    content = loop.run_until_complete(serialize_response(field=field, response_content=page, exclude_unset=True))
+    return JSONResponse(content).body
+
+
+def manual_encoder_path(items: list[Article]) -> bytes:
+    """Путь с jsonable_encoder, как в прежнем routing/users.py:get_user"""
+    return JSONResponse(jsonable_encoder(items)).body
+
+
+def fast_path(items) -> bytes:
+    return FastJSONResponse(items).body
+
+
+def fast_page_path(page: ArticlePage) -> bytes:
+    return FastJSONResponse(page, exclude_unset=True).body
+
+
+def report(name: str, seconds: float, repeat: int, rows: int, baseline: float | None = None) -> None:
+    per_call = seconds / repeat
+    line = f"{name:<40} {per_call * 1000:9.3f} ms/response {per_call / rows * 1e6:8.2f} us/row"
+    if baseline is not None:
+        line += f"  x{baseline / seconds:.1f}"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    items = [Article.model_validate(row) for row in rows]
+    page = ArticlePage(items=items, next_cursor="cursor")
+    list_field = create_model_field("Response", list[Article], mode="serialization")
+    page_field = create_model_field("Response", ArticlePage, mode="serialization")
+
+    assert json.loads(current_path(list_field, rows)) == json.loads(fast_path(items))
+    assert json.loads(current_page_path(page_field, page)) == json.loads(fast_page_path(page))
+
+    print(f"rows={args.rows} repeat={args.repeat}")
+    baseline = timeit.timeit(lambda: current_path(list_field, rows), number=args.repeat)
+    report("response_model list[Article] (ORM rows)", baseline, args.repeat, args.rows)
+    report("jsonable_encoder + JSONResponse", timeit.timeit(lambda: manual_encoder_path(items), number=args.repeat),
+           args.repeat, args.rows, baseline)
+    report("FastJSONResponse list[Article]", timeit.timeit(lambda: fast_path(items), number=args.repeat),
+           args.repeat, args.rows, baseline)
+
+    page_baseline = timeit.timeit(lambda: current_page_path(page_field, page), number=args.repeat)
+    report("response_model ArticlePage", page_baseline, args.repeat, args.rows)
+    report("FastJSONResponse ArticlePage", timeit.timeit(lambda: fast_page_path(page), number=args.repeat),
+           args.repeat, args.rows, page_baseline)
+
+
+if __name__ == "__main__":
+    main()
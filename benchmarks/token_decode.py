@@ -0,0 +1,78 @@
+"""
+Пропускная способность TokenService.decode_token с кэшем проверенных токенов и без него.
+
+Для каждого алгоритма создаются ключи и --tokens токенов (по токену на пользователя),
+затем каждый токен проверяется --repeat раз вперемешку, как при потоке запросов с x-access-token.
+Выводится количество проверок в секунду и доля попаданий в кэш.
+
+Запуск: python -m benchmarks.token_decode [--tokens 1000] [--repeat 50]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from src.config import auth_jwt
+from src.services import LRUCache, TokenService
+
+
+def pem_keys(algorithm: str) -> tuple[str, str]:
+    """Возвращает закрытый и открытый ключи в PEM для алгоритма или общий секрет для HS256"""
+    if algorithm == "HS256":
+        secret = uuid4().hex * 2
+        return secret, secret
+
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    return private_pem, public_pem
+
+
+async def measure(token_service: TokenService, tokens: list[str], repeat: int) -> float:
+    """Возвращает количество проверок токенов в секунду"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for token in tokens:
+            await token_service.decode_token(token)
+    return len(tokens) * repeat / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"tokens={args.tokens} repeat={args.repeat}")
+    for algorithm in ("HS256", "RS256", "ES256", "EdDSA"):
+        auth_jwt.ALGORITHM = algorithm
+        auth_jwt.PRIVATE_JWT, auth_jwt.PUBLIC_JWT = pem_keys(algorithm)
+
+        expires = datetime.now(timezone.utc) + timedelta(minutes=15)
+        signer = TokenService()
+        tokens = [await signer.create_token({"sub": uuid4()}, expires) for _ in range(args.tokens)]
+
+        uncached = await measure(TokenService(cache=LRUCache(maxsize=0)), tokens, args.repeat)
+        cached_service = TokenService(cache=LRUCache(maxsize=args.tokens, ttl=300))
+        cached = await measure(cached_service, tokens, args.repeat)
+
+        print(f"{algorithm}  no cache {uncached:10.0f} decodes/s   cache {cached:10.0f} decodes/s   "
+              f"x{cached / uncached:.1f}  hit rate {cached_service.cache.stats()['hit_rate']:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
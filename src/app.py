@@ -1,15 +1,20 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 import uvicorn
 from fastapi import FastAPI
+from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
 from src.config import logger
 from src.schemas import AccessLevel
-from src.repositories import db, Base
+from src.repositories import db, Base, AuthorStatsRepository
+from src.depends import article_service, authentication_service, registration_service, token_service
 from src.routing import router
+from src.routing.consistency import ReadYourWritesMiddleware
 from passlib.context import CryptContext
 import os
 from dotenv import load_dotenv
 from src.repositories import User
+from src.repositories.model import USERS_ROLE_VERSION_DDL
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
@@ -19,6 +24,8 @@ load_dotenv()
 @logger.catch
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    token_service.keys.load()
+
     connection = psycopg2.connect(
         user=os.getenv("DB_LOGIN"),
         password=os.getenv("DB_PASSWORD"),
@@ -41,6 +48,30 @@ async def lifespan(app: FastAPI):
 
     async with db.engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # create_all не добавляет колонки и индексы в уже существующие таблицы
+        await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS role_version INTEGER NOT NULL DEFAULT 1"))
+        for ddl in USERS_ROLE_VERSION_DDL:
+            await conn.execute(ddl)
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_created_at_id ON articles (created_at, id)"))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_articles_author_id_created_at_id ON articles (author_id, created_at, id)"
+        ))
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_rating ON articles (rating)"))
+        await conn.execute(text(
+            "ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS "
+            "(setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', text), 'B')) STORED"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_articles_search_vector ON articles USING gin (search_vector)"
+        ))
+        await conn.execute(text("ALTER TABLE articles ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1"))
+
+    async with db.session_factory() as session:
+        await AuthorStatsRepository().rebuild(session)
+
+    async with db.session_factory() as session:
+        await article_service.refresh_ranking(session)
+    ranking_refresh = asyncio.create_task(article_service.refresh_ranking_periodically(db.session_factory))
 
     async with db.session_factory() as session:
         try:
@@ -57,11 +88,21 @@ async def lifespan(app: FastAPI):
             logger.info(f"superuser created: {os.getenv("SUPERUSERNAME"),} / {(os.getenv("SUPERUSRPASSWORD"))}/n{password_hash}")
         except IntegrityError:
             logger.info(f"superuser already exists")
+
+    async with db.session_factory() as session:
+        await registration_service.warm_up(session)
+        logger.info(f"registration filter warmed with {len(registration_service.known_users) // 2} users")
     yield
+    ranking_refresh.cancel()
+    with suppress(asyncio.CancelledError):
+        await ranking_refresh
+    await db.dispose()
+    authentication_service.hasher.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
 app.include_router(router)
+app.add_middleware(ReadYourWritesMiddleware)
 
 
 @app.get("",
@@ -17,19 +17,63 @@ logger.add(
 
 class DbSettings(BaseModel):
     url: str = f"postgresql+asyncpg://{os.getenv("DB_LOGIN")}:{os.getenv("DB_PASSWORD")}@{os.getenv("DB_HOST")}:5432/{os.getenv('DB_NAME')}"
-    echo: bool = True
+    echo: bool = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+    slow_query_ms: float = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+    query_sample_rate: float = float(os.getenv("DB_QUERY_SAMPLE_RATE", 0))
+    replica_urls: list[str] = [url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+    replica_strategy: str = os.getenv("DB_REPLICA_STRATEGY", "round_robin")
+    read_your_writes_window: float = float(os.getenv("DB_READ_YOUR_WRITES_WINDOW", 5))
+    pool_size: int = int(os.getenv("DB_POOL_SIZE", 10))
+    max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    prepared_statement_cache_size: int = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", 100))
+
+
+class CacheSettings(BaseModel):
+    article_maxsize: int = int(os.getenv("ARTICLE_CACHE_SIZE", 1024))
+    article_ttl: float = float(os.getenv("ARTICLE_CACHE_TTL", 60))
+    rendered_maxsize: int = int(os.getenv("RENDERED_CACHE_SIZE", 4096))
+    rendered_article_maxbytes: int = int(os.getenv("RENDERED_ARTICLE_CACHE_BYTES", 32 * 1024 * 1024))
+    rendered_page_maxbytes: int = int(os.getenv("RENDERED_PAGE_CACHE_BYTES", 32 * 1024 * 1024))
+
+
+class RankingSettings(BaseModel):
+    ttl: float = float(os.getenv("RANKING_TTL", 300))
+    trending_half_life: float = float(os.getenv("TRENDING_HALF_LIFE", 86400))
+
+
+class HashingSettings(BaseModel):
+    workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+    max_queue: int = int(os.getenv("PASSWORD_HASH_QUEUE", 64))
+    retry_after: int = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 1))
+
+
+class RegistrationSettings(BaseModel):
+    bloom_capacity: int = int(os.getenv("REGISTRATION_BLOOM_CAPACITY", 1_000_000))
+    bloom_error_rate: float = float(os.getenv("REGISTRATION_BLOOM_ERROR_RATE", 0.01))
 
 
 class AuthJWT:
     PRIVATE_JWT: str = os.getenv("PRIVATE_JWT")
     PUBLIC_JWT: str = os.getenv("PUBLIC_JWT")
+    # HS256, RS256, ES256 или EdDSA (ключи Ed25519 в PEM)
     ALGORITHM: str = os.getenv("ALGORITHM")
     ACCESS_TIMEDELTA: int = os.getenv("ACCESS_TIMEDELTA")
     REFRESH_TIMEDELTA: int = os.getenv("REFRESH_TIMEDELTA")
+    ROLE_CACHE_TTL: float = os.getenv("ROLE_CACHE_TTL", 30)
+    ROLE_CACHE_SIZE: int = os.getenv("ROLE_CACHE_SIZE", 10000)
+    TOKEN_CACHE_TTL: float = os.getenv("TOKEN_CACHE_TTL", 300)
+    TOKEN_CACHE_SIZE: int = os.getenv("TOKEN_CACHE_SIZE", 10000)
 
 
 class Settings(BaseSettings):
     db: DbSettings = DbSettings()
+    cache: CacheSettings = CacheSettings()
+    ranking: RankingSettings = RankingSettings()
+    hashing: HashingSettings = HashingSettings()
+    registration: RegistrationSettings = RegistrationSettings()
     auth_jwt: AuthJWT = AuthJWT()
 
 
@@ -1,8 +1,11 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from time import time
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.repositories import db
 from src.repositories import ArticleRepository, AuthenticationRepository, UserRepository
-from src.services import ArticleService, AuthenticationService, UserService, RegistrationService, TokenService
+from src.services import ArticleService, RenderedCache, AuthenticationService, UserService, RegistrationService, TokenService
 
 
 async def get_session() -> AsyncSession:
@@ -10,12 +13,41 @@ async def get_session() -> AsyncSession:
         yield session
 
 
+async def get_session_factory() -> async_sessionmaker:
+    return db.session_factory
+
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+def reads_from_primary(request: Request) -> bool:
+    """Проверяет, писал ли клиент недавно: тогда он читает из основной базы данных, чтобы увидеть свои изменения"""
+    until = request.cookies.get(READ_PRIMARY_COOKIE)
+    try:
+        return until is not None and float(until) > time()
+    except ValueError:
+        return False
+
+
+async def get_read_session(request: Request) -> AsyncSession:
+    async for session in db.read_session_dependency(primary=reads_from_primary(request)):
+        yield session
+
+
+async def get_read_session_factory(request: Request) -> async_sessionmaker:
+    return db.session_factory if reads_from_primary(request) else db.read_session_factory
+
+
 article_repository = ArticleRepository()
 article_service = ArticleService(article_repository)
 async def get_articles_service() -> ArticleService:
     return article_service
 
 
+async def get_rendered_cache() -> RenderedCache:
+    return article_service.rendered
+
+
 users_repository = UserRepository()
 users_service = UserService(users_repository)
 async def get_users_service() -> UserService:
@@ -29,11 +61,11 @@ async def get_authentication_service() -> AuthenticationService:
     return authentication_service
 
 
-registration_service = RegistrationService(authentication_repository)
+registration_service = RegistrationService(authentication_repository, authentication_service.hasher, users_repository)
 async def get_registration_service() -> RegistrationService:
     return registration_service
 
 
-token_service = TokenService()
+token_service = authentication_service.token_service
 async def get_token_service() -> TokenService:
     return token_service
\ No newline at end of file
@@ -7,12 +7,15 @@ __all__ = [
     "AuthenticationRepository",
     "ArticleRepository",
     "UserRepository",
-    "Article"
+    "Article",
+    "AuthorStats",
+    "AuthorStatsRepository",
 ]
 
 
 from .db import Database, db
-from .model import Base, User, Refresh, Article
+from .model import Base, User, Refresh, Article, AuthorStats
+from .stats import AuthorStatsRepository
 from .sicrets import AuthenticationRepository
 from .articles import ArticleRepository
 from .users import UserRepository
\ No newline at end of file
@@ -1,53 +1,342 @@
-from typing import Type
+from datetime import datetime
+from typing import AsyncIterator
+from uuid import UUID
 from sqlalchemy.exc import SQLAlchemyError
-from src.schemas import ArticleCreate, ArticleUpdate, Article
-from sqlalchemy import select
+from src.schemas import ArticleCreate, ArticleUpdate, Article, ArticlePage, ArticleFilter
+from sqlalchemy import select, insert, update, delete, tuple_, func
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
-from .model import Article as ArticleModel
+from .cursor import encode_cursor, decode_cursor
+from .model import Article as ArticleModel, User as UserModel
+from .rows import ARTICLE_COLUMNS, AUTHOR_COLUMNS, article_from_row, article_with_author_from_row, partial_article_from_row
+from .stats import AuthorStatsRepository
 from fastapi import HTTPException, status
 
 
+SEARCH_CONFIG = "simple"
+BULK_CHUNK_SIZE = 1000
+
+
 class ArticleRepository:
     """
     Репозиторий для работы с статьями. Содержит методы для создания, получения,
     обновления и удаления статей.
+
+    Запись идет через ORM, чтение - через Core select() по явному списку колонок (см. rows.py).
     """
 
+    def __init__(self, stats: AuthorStatsRepository | None = None):
+        """
+        Инициализация репозитория статей.
+
+        :param stats: Репозиторий агрегатов по авторам, которые обновляются вместе со статьями.
+        """
+        self.stats = stats if stats is not None else AuthorStatsRepository()
+
     async def create_article(self, session: AsyncSession, article_in: ArticleCreate) -> Article:
         """
-        Создает новую статью в базе данных.
+        Создает новую статью в базе данных. Агрегаты автора обновляются в той же транзакции.
 
         :param session: Асинхронная сессия для работы с базой данных.
         :param article_in: Объект данных статьи, которую необходимо создать.
         :return: Созданная статья.
         :raises HTTPException: Ошибка сервера, если произошла ошибка при добавлении статьи в базу данных.
         """
-        article = ArticleModel(**article_in.model_dump())
+        stmt = insert(ArticleModel).values(**article_in.model_dump()).returning(ArticleModel)
         try:
-            session.add(article)
+            res = await session.execute(stmt)
+            article = Article.model_validate(res.scalar_one())
+            await self.stats.article_created(session, article.author_id, article.rating)
             await session.commit()
-            await session.refresh(article)
             return article
         except SQLAlchemyError as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    async def get_articles(self, session: AsyncSession) -> list[Article]:
+    async def create_articles(self, session: AsyncSession, articles_in: list[ArticleCreate]) -> list[Article]:
         """
-        Получает все статьи из базы данных.
+        Создает несколько статей в одной транзакции.
+
+        Статьи вставляются многострочными INSERT ... RETURNING порциями по BULK_CHUNK_SIZE строк,
+        то есть один запрос к базе данных на порцию, а не три на каждую статью. Агрегаты
+        авторов обновляются одним запросом на весь пакет.
 
         :param session: Асинхронная сессия для работы с базой данных.
-        :return: Список всех статей.
+        :param articles_in: Список данных статей, которые необходимо создать.
+        :return: Созданные статьи в порядке входного списка.
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при добавлении статей в базу данных.
+        """
+        rows = [article_in.model_dump() for article_in in articles_in]
+        created = []
+        try:
+            for start in range(0, len(rows), BULK_CHUNK_SIZE):
+                res = await session.execute(
+                    insert(ArticleModel).returning(ArticleModel, sort_by_parameter_order=True),
+                    rows[start:start + BULK_CHUNK_SIZE],
+                )
+                created.extend(Article.model_validate(article) for article in res.scalars())
+
+            await self.stats.articles_created(session, [(article.author_id, article.rating) for article in created])
+            await session.commit()
+            return created
+        except SQLAlchemyError as e:
+            await session.rollback()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def find_existing_authors(self, session: AsyncSession, author_ids: set[UUID]) -> set[UUID]:
+        """
+        Проверяет одним запросом, какие из авторов существуют.
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :param author_ids: ID авторов, которые нужно проверить.
+        :return: ID найденных авторов.
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при запросе к базе данных.
+        """
+        if not author_ids:
+            return set()
+
+        stmt = select(UserModel.uuid).where(UserModel.uuid.in_(author_ids))
+        try:
+            return set((await session.scalars(stmt)).all())
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @staticmethod
+    def _filter_clauses(filters: ArticleFilter | None) -> list:
+        """Преобразует фильтры списка статей в условия WHERE"""
+        if filters is None:
+            return []
+
+        clauses = []
+        if filters.author_id is not None:
+            clauses.append(ArticleModel.author_id == filters.author_id)
+        if filters.min_rating is not None:
+            clauses.append(ArticleModel.rating >= filters.min_rating)
+        if filters.max_rating is not None:
+            clauses.append(ArticleModel.rating <= filters.max_rating)
+        if filters.created_after is not None:
+            clauses.append(ArticleModel.created_at >= filters.created_after)
+        if filters.created_before is not None:
+            clauses.append(ArticleModel.created_at < filters.created_before)
+        return clauses
+
+    async def get_articles(self, session: AsyncSession, limit: int = 20, cursor: str | None = None,
+                           fields: list[str] | None = None, filters: ArticleFilter | None = None,
+                           embed_author: bool = False) -> ArticlePage:
+        """
+        Получает страницу статей, отсортированных от новых к старым.
+
+        Пагинация курсорная: следующая страница начинается сразу после пары (created_at, id)
+        последней статьи предыдущей страницы, поэтому стоимость запроса не зависит от
+        глубины пролистывания и размера таблицы.
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :param limit: Максимальное количество статей на странице.
+        :param cursor: Курсор из поля next_cursor предыдущей страницы или None для первой страницы.
+        :param fields: Имена полей статьи, которые нужно вернуть. Из базы данных выбираются
+            только эти колонки (и колонки ключа сортировки); id возвращается всегда.
+            None - статьи возвращаются целиком.
+        :param filters: Фильтры по автору, диапазону рейтинга и дате создания.
+        :param embed_author: Добавить к статьям имя и роль автора. Автор загружается в том же
+            запросе через LEFT OUTER JOIN. Не используется вместе с fields.
+        :return: Страница статей и курсор следующей страницы (None, если страница последняя).
+        :raises HTTPException: Ошибка 400, если курсор невалиден.
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при получении статей.
+        """
+        if fields:
+            columns = dict.fromkeys(["id", "created_at", *fields])
+            stmt = select(*(getattr(ArticleModel, name) for name in columns))
+        elif embed_author:
+            stmt = select(*ARTICLE_COLUMNS, *AUTHOR_COLUMNS).outerjoin(UserModel, ArticleModel.author_id == UserModel.uuid)
+        else:
+            stmt = select(*ARTICLE_COLUMNS)
+
+        stmt = (
+            stmt
+            .where(*self._filter_clauses(filters))
+            .order_by(ArticleModel.created_at.desc(), ArticleModel.id.desc())
+            .limit(limit + 1)
+        )
+
+        if cursor is not None:
+            created_at, article_id = decode_cursor(cursor, datetime, int)
+            stmt = stmt.where(tuple_(ArticleModel.created_at, ArticleModel.id) < tuple_(created_at, article_id))
+
+        try:
+            res = await session.execute(stmt)
+            rows = list(res.all())
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+        if fields:
+            returned = list(dict.fromkeys(["id", *fields]))
+            articles = [partial_article_from_row(row, returned) for row in rows]
+        elif embed_author:
+            articles = [article_with_author_from_row(row) for row in rows]
+        else:
+            articles = [article_from_row(row) for row in rows]
+
+        return ArticlePage.model_construct(items=articles, next_cursor=next_cursor)
+
+    async def get_author_articles(self, session: AsyncSession, author_name: str, limit: int = 20,
+                                  cursor: str | None = None) -> ArticlePage:
+        """
+        Получает страницу статей автора по его имени, от новых к старым.
+
+        Статьи и автор выбираются одним запросом с JOIN по users, автор заполняется
+        из той же строки результата без отдельных запросов на каждую статью.
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :param author_name: Имя автора.
+        :param limit: Максимальное количество статей на странице.
+        :param cursor: Курсор из поля next_cursor предыдущей страницы или None для первой страницы.
+        :return: Страница статей с автором и курсор следующей страницы.
+        :raises HTTPException: Ошибка 400, если курсор невалиден.
+        :raises HTTPException: Ошибка 404, если пользователь с таким именем не найден.
         :raises HTTPException: Ошибка сервера, если произошла ошибка при получении статей.
         """
-        stmt = select(ArticleModel)
+        stmt = (
+            select(*ARTICLE_COLUMNS, *AUTHOR_COLUMNS)
+            .join(UserModel, ArticleModel.author_id == UserModel.uuid)
+            .where(UserModel.name == author_name)
+            .order_by(ArticleModel.created_at.desc(), ArticleModel.id.desc())
+            .limit(limit + 1)
+        )
+
+        if cursor is not None:
+            created_at, article_id = decode_cursor(cursor, datetime, int)
+            stmt = stmt.where(tuple_(ArticleModel.created_at, ArticleModel.id) < tuple_(created_at, article_id))
+
         try:
             res = await session.execute(stmt)
-            articles = res.scalars().all()
-            return list(articles)
+            rows = list(res.all())
+
+            if not rows and cursor is None:
+                exists = await session.scalar(select(UserModel.uuid).where(UserModel.name == author_name))
+                if exists is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="User not found"
+                    )
         except SQLAlchemyError as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    async def get_article_by_id(self, session: AsyncSession, article_id: int) -> Type[Article] | None:
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+        return ArticlePage.model_construct(items=[article_with_author_from_row(row) for row in rows],
+                                           next_cursor=next_cursor)
+
+    async def search_articles(self, session: AsyncSession, query: str, limit: int = 20,
+                              cursor: str | None = None) -> ArticlePage:
+        """
+        Выполняет полнотекстовый поиск статей по заголовку и тексту.
+
+        Поиск идет по хранимой колонке search_vector (совпадения в заголовке весят больше,
+        чем в тексте) с использованием GIN-индекса. Результаты отсортированы по релевантности
+        (ts_rank), пагинация курсорная по паре (rank, id).
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :param query: Поисковый запрос в синтаксисе websearch_to_tsquery.
+        :param limit: Максимальное количество статей на странице.
+        :param cursor: Курсор из поля next_cursor предыдущей страницы или None для первой страницы.
+        :return: Страница найденных статей и курсор следующей страницы.
+        :raises HTTPException: Ошибка 400, если курсор невалиден.
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при поиске статей.
+        """
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank(ArticleModel.search_vector, ts_query)
+
+        stmt = (
+            select(*ARTICLE_COLUMNS, rank.label("rank"))
+            .where(ArticleModel.search_vector.bool_op("@@")(ts_query))
+            .order_by(rank.desc(), ArticleModel.id.desc())
+            .limit(limit + 1)
+        )
+
+        if cursor is not None:
+            last_rank, article_id = decode_cursor(cursor, float, int)
+            stmt = stmt.where(tuple_(rank, ArticleModel.id) < tuple_(last_rank, article_id))
+
+        try:
+            res = await session.execute(stmt)
+            rows = list(res.all())
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].rank, rows[-1].id)
+
+        return ArticlePage.model_construct(items=[article_from_row(row) for row in rows], next_cursor=next_cursor)
+
+    async def stream_articles(self, session: AsyncSession, filters: ArticleFilter | None = None,
+                              chunk_size: int = 500) -> AsyncIterator[list[Article]]:
+        """
+        Потоково читает все статьи через серверный курсор, порциями по chunk_size строк.
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :param filters: Фильтры по автору, диапазону рейтинга и дате создания.
+        :param chunk_size: Количество строк, получаемых из базы данных за одну порцию.
+        :return: Асинхронный итератор порций статей, от новых к старым.
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при получении статей.
+        """
+        stmt = (
+            select(*ARTICLE_COLUMNS)
+            .where(*self._filter_clauses(filters))
+            .order_by(ArticleModel.created_at.desc(), ArticleModel.id.desc())
+            .execution_options(yield_per=chunk_size)
+        )
+        try:
+            result = await session.stream(stmt)
+            async for partition in result.partitions():
+                yield [article_from_row(row) for row in partition]
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def get_ranking_keys(self, session: AsyncSession) -> list:
+        """
+        Получает только поля, по которым ранжируются статьи, без заголовка и текста.
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :return: Строки с полями id, rating и created_at.
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при запросе к базе данных.
+        """
+        stmt = select(ArticleModel.id, ArticleModel.rating, ArticleModel.created_at)
+        try:
+            result = await session.execute(stmt)
+            return list(result.all())
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def get_articles_by_ids(self, session: AsyncSession, article_ids: list[int]) -> list[Article]:
+        """
+        Получает статьи по списку ID одним запросом.
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :param article_ids: Идентификаторы статей в нужном порядке.
+        :return: Найденные статьи в порядке article_ids. Отсутствующие в базе пропускаются.
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при запросе к базе данных.
+        """
+        if not article_ids:
+            return []
+
+        stmt = select(*ARTICLE_COLUMNS).where(ArticleModel.id.in_(article_ids))
+        try:
+            result = await session.execute(stmt)
+            articles = {row.id: article_from_row(row) for row in result}
+            return [articles[article_id] for article_id in article_ids if article_id in articles]
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def get_article_by_id(self, session: AsyncSession, article_id: int) -> Article | None:
         """
         Получает статью по её ID.
 
@@ -57,11 +346,13 @@ class ArticleRepository:
         :raises HTTPException: Ошибка 404, если статья с таким ID не найдена.
         :raises HTTPException: Ошибка сервера, если произошла ошибка при запросе к базе данных.
         """
+        stmt = select(*ARTICLE_COLUMNS).where(ArticleModel.id == article_id)
         try:
-            result = await session.get(ArticleModel, article_id)
+            result = await session.execute(stmt)
+            row = result.first()
 
-            if result is not None:
-                return result
+            if row is not None:
+                return article_from_row(row)
 
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -70,46 +361,99 @@ class ArticleRepository:
         except SQLAlchemyError as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    async def update_article(self, session: AsyncSession, article_update: ArticleUpdate, article_id: int) -> Article | None:
+    async def update_article(self, session: AsyncSession, article_update: ArticleUpdate, article_id: int) -> Article:
         """
-        Обновляет существующую статью.
+        Обновляет существующую статью одним условным запросом UPDATE ... RETURNING.
+
+        Используется оптимистичная блокировка: строка обновляется, только если её версия
+        совпадает с article_update.version, после чего версия увеличивается на 1. Блокировки
+        строк не берутся. Записываются только поля, явно переданные в article_update.
+        Прежние автор и рейтинг статьи возвращаются тем же запросом для обновления агрегатов автора.
 
         :param session: Асинхронная сессия для работы с базой данных.
-        :param article_update: Объект данных для обновления статьи.
+        :param article_update: Объект данных для обновления статьи с версией, которую видел клиент.
         :param article_id: Идентификатор статьи, которую необходимо обновить.
-        :return: Обновленная статья или None, если статья не найдена.
+        :return: Обновленная статья с новой версией.
+        :raises HTTPException: Ошибка 404, если статья с таким ID не найдена.
+        :raises HTTPException: Ошибка 409, если статья уже изменена другим запросом.
         :raises HTTPException: Ошибка сервера, если произошла ошибка при обновлении статьи.
         """
+        values = article_update.model_dump(exclude_unset=True, exclude={"id", "version"})
+        previous = aliased(ArticleModel)
+        old = (
+            select(previous.id, previous.author_id.label("old_author_id"), previous.rating.label("old_rating"))
+            .where(previous.id == article_id)
+            .subquery("old")
+        )
+        stmt = (
+            update(ArticleModel)
+            .where(ArticleModel.id == old.c.id, ArticleModel.version == article_update.version)
+            .values(**values, version=ArticleModel.version + 1)
+            .returning(ArticleModel, old.c.old_author_id, old.c.old_rating)
+        )
         try:
-            article = await self.get_article_by_id(session=session, article_id=article_id)
+            res = await session.execute(stmt, execution_options={"synchronize_session": False})
+            row = res.one_or_none()
 
-            if not article:
-                return None
-
-            for key, value in article_update.model_dump().items():
-                setattr(article, key, value)
+            if row is None:
+                await self._raise_update_conflict(session=session, article_id=article_id)
 
+            article = Article.model_validate(row.Article)
+            if values.keys() & {"author_id", "rating", "created_at"}:
+                await self.stats.article_updated(session, row.old_author_id, row.old_rating,
+                                                 article.author_id, article.rating)
             await session.commit()
-            return article_update
+            return article
         except SQLAlchemyError as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @staticmethod
+    async def _raise_update_conflict(session: AsyncSession, article_id: int) -> None:
+        """
+        Определяет, почему условный UPDATE не затронул ни одной строки.
+        Выполняется только на пути ошибки, успешное обновление остается одним запросом.
+        """
+        exists = await session.scalar(select(ArticleModel.id).where(ArticleModel.id == article_id))
+
+        if exists is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Article not found"
+            )
+
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Article was modified by another request"
+        )
+
     async def delete_article(self, session: AsyncSession, article_id: int) -> None:
         """
-        Удаляет статью из базы данных.
+        Удаляет статью из базы данных одним запросом DELETE ... RETURNING.
+        Агрегаты автора обновляются в той же транзакции.
 
         :param session: Асинхронная сессия для работы с базой данных.
         :param article_id: Идентификатор статьи, которую необходимо удалить.
         :return: None
+        :raises HTTPException: Ошибка 404, если статья с таким ID не найдена.
         :raises HTTPException: Ошибка сервера, если произошла ошибка при удалении статьи.
         """
+        stmt = (
+            delete(ArticleModel)
+            .where(ArticleModel.id == article_id)
+            .returning(ArticleModel.id, ArticleModel.author_id, ArticleModel.rating)
+        )
         try:
-            article = await self.get_article_by_id(session=session, article_id=article_id)
+            res = await session.execute(stmt)
+            deleted = res.one_or_none()
 
-            if article:
-                await session.delete(article)
-                await session.commit()
+            if deleted is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Article not found"
+                )
 
+            await self.stats.article_deleted(session, deleted.author_id, deleted.rating)
+            await session.commit()
             return None
         except SQLAlchemyError as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
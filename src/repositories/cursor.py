@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values) -> str:
+    """
+    Кодирует значения ключа сортировки в непрозрачный курсор.
+
+    :param values: Значения ключа последней записи страницы (например, created_at и id).
+    :return: Курсор в виде url-safe строки base64.
+    """
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """
+    Декодирует курсор, созданный encode_cursor, и приводит значения к ожидаемым типам.
+
+    :param cursor: Курсор, полученный клиентом в поле next_cursor.
+    :param types: Ожидаемые типы значений ключа в том же порядке, что и при кодировании.
+    :return: Кортеж значений ключа.
+    :raises HTTPException: Ошибка 400, если курсор поврежден или не соответствует ключу.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("Cursor does not match the sort key")
+
+        return tuple(
+            datetime.fromisoformat(value) if type_ is datetime else type_(value)
+            for type_, value in zip(types, values)
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        ) from e
@@ -1,25 +1,155 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from itertools import count
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 from src.config import settings
+from .instrumentation import QueryStats
+from .pool import InstrumentedPool
 
 
 class Database:
-    def __init__(self, url: str, echo: bool = False):
-        self.engine = create_async_engine(
-            url=url,
-            echo=echo
-        )
+    """
+    Подключение к основной базе данных и, если они заданы, к репликам только для чтения.
+
+    Запись и чтение собственных изменений идут через session_factory основной базы данных.
+    read_session_factory выбирает реплику по очереди (round_robin) или наименее загруженную
+    по числу занятых соединений пула (least_loaded). Без реплик чтение идет в основную базу данных.
+    Клиент, который недавно писал, читает из основной базы данных в течение primary_window секунд
+    (см. ReadYourWritesMiddleware и get_read_session).
+    """
+
+    def __init__(self, url: str, echo: bool = False, replica_urls: list[str] | tuple[str, ...] = (),
+                 replica_strategy: str = "round_robin", primary_window: float = 0.0,
+                 pool_size: int = 5, max_overflow: int = 10, pool_timeout: float = 30.0,
+                 pool_recycle: int = -1, pool_pre_ping: bool = False,
+                 prepared_statement_cache_size: int = 100, slow_query_ms: float = 200.0,
+                 query_sample_rate: float = 0.0):
+        """
+        :param url: URL основной базы данных.
+        :param echo: Логировать SQL-запросы.
+        :param replica_urls: URL реплик только для чтения.
+        :param replica_strategy: Выбор реплики: "round_robin" или "least_loaded".
+        :param primary_window: Сколько секунд после записи клиент читает из основной базы данных.
+        :param pool_size: Количество постоянно открытых соединений в пуле каждого движка.
+        :param max_overflow: Сколько соединений можно открыть сверх pool_size при нехватке.
+        :param pool_timeout: Сколько секунд ждать свободное соединение до ошибки.
+        :param pool_recycle: Через сколько секунд пересоздавать соединение. -1 - не пересоздавать.
+        :param pool_pre_ping: Проверять соединение перед выдачей из пула.
+        :param prepared_statement_cache_size: Размер кэша подготовленных запросов asyncpg на соединение.
+            0 отключает кэш, например, при работе через pgbouncer в режиме транзакций.
+        :param slow_query_ms: Порог в миллисекундах, начиная с которого запрос пишется в лог как медленный.
+        :param query_sample_rate: Доля остальных запросов, которые пишутся в лог.
+        :raises ValueError: Неизвестная стратегия выбора реплики.
+        """
+        if replica_strategy not in ("round_robin", "least_loaded"):
+            raise ValueError(f"Unknown replica strategy: {replica_strategy}")
+
+        self.echo = echo
+        self.pool_options = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+            "pool_recycle": pool_recycle,
+            "pool_pre_ping": pool_pre_ping,
+        }
+        self.prepared_statement_cache_size = prepared_statement_cache_size
+        self.query_stats = QueryStats(slow_ms=slow_query_ms, sample_rate=query_sample_rate)
+
+        self.engine = self._create_engine(url)
         self.session_factory = async_sessionmaker(
             bind=self.engine,
             autocommit=False,
         )
+        self.replica_engines = [self._create_engine(replica_url) for replica_url in replica_urls]
+        self.replica_session_factories = [
+            async_sessionmaker(bind=engine, autocommit=False) for engine in self.replica_engines
+        ]
+        self.replica_strategy = replica_strategy
+        self.primary_window = primary_window
+        self._next_replica = count()
+
+    @property
+    def read_session_factory(self) -> async_sessionmaker:
+        """Фабрика сессий для чтения: реплика по стратегии или основная база данных"""
+        if not self.replica_session_factories:
+            return self.session_factory
+
+        if self.replica_strategy == "least_loaded":
+            index = min(range(len(self.replica_engines)),
+                        key=lambda i: getattr(self.replica_engines[i].pool, "checkedout", lambda: 0)())
+        else:
+            index = next(self._next_replica) % len(self.replica_session_factories)
+        return self.replica_session_factories[index]
+
+    def _create_engine(self, url: str) -> AsyncEngine:
+        """
+        Создает движок с пулом InstrumentedPool и настройками пула и подключает к нему учет времени запросов.
+        SQLite работает без сетевых соединений, поэтому для него остается пул по умолчанию.
+        """
+        url = make_url(url)
+        if url.get_backend_name() == "sqlite":
+            engine = create_async_engine(url=url, echo=self.echo)
+        else:
+            connect_args = {}
+            if url.get_driver_name() == "asyncpg":
+                connect_args["prepared_statement_cache_size"] = self.prepared_statement_cache_size
 
+            engine = create_async_engine(
+                url=url,
+                echo=self.echo,
+                poolclass=InstrumentedPool,
+                connect_args=connect_args,
+                **self.pool_options,
+            )
+
+        self.query_stats.instrument(engine)
+        return engine
+
+    def pool_stats(self) -> dict:
+        """Возвращает показатели пулов соединений основной базы данных и реплик"""
+        def stats(engine: AsyncEngine) -> dict:
+            pool = engine.pool
+            return pool.stats() if isinstance(pool, InstrumentedPool) else {"status": pool.status()}
+
+        return {
+            "primary": stats(self.engine),
+            "replicas": [stats(engine) for engine in self.replica_engines],
+        }
 
     async def session_dependency(self) -> AsyncSession:
         async with self.session_factory() as session:
             yield session
             await session.close()
 
+    async def read_session_dependency(self, primary: bool = False) -> AsyncSession:
+        """
+        Сессия только для чтения.
+
+        :param primary: Читать из основной базы данных, например, чтобы увидеть только что записанные данные.
+        """
+        session_factory = self.session_factory if primary else self.read_session_factory
+        async with session_factory() as session:
+            yield session
+            await session.close()
+
+    async def dispose(self) -> None:
+        """Закрывает пулы соединений основной базы данных и реплик"""
+        await self.engine.dispose()
+        for engine in self.replica_engines:
+            await engine.dispose()
+
 
 db = Database(url=settings.db.url,
-              echo=settings.db.echo
+              echo=settings.db.echo,
+              replica_urls=settings.db.replica_urls,
+              replica_strategy=settings.db.replica_strategy,
+              primary_window=settings.db.read_your_writes_window,
+              pool_size=settings.db.pool_size,
+              max_overflow=settings.db.max_overflow,
+              pool_timeout=settings.db.pool_timeout,
+              pool_recycle=settings.db.pool_recycle,
+              pool_pre_ping=settings.db.pool_pre_ping,
+              prepared_statement_cache_size=settings.db.prepared_statement_cache_size,
+              slow_query_ms=settings.db.slow_query_ms,
+              query_sample_rate=settings.db.query_sample_rate,
               )
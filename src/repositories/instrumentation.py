@@ -0,0 +1,153 @@
+import random
+import re
+from bisect import bisect_left
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import logger
+
+# Границы корзин гистограммы времени выполнения в миллисекундах, последняя корзина - все, что дольше
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+OTHER_FINGERPRINT = "<other>"
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|\?|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Приводит SQL-запрос к отпечатку: параметры и литералы заменяются на ?, списки параметров
+    IN (...) любой длины сворачиваются в (?...), пробелы схлопываются.
+    """
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class StatementHistogram:
+    """Гистограмма времени выполнения одного отпечатка запроса"""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total += elapsed_ms
+        self.max = max(self.max, elapsed_ms)
+        self.buckets[bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+    def percentile(self, q: float) -> float:
+        """Оценка перцентиля сверху: граница корзины, в которую он попадает"""
+        rank = q * self.count
+        seen = 0
+        for bound, bucket in zip(BUCKETS_MS, self.buckets):
+            seen += bucket
+            if seen >= rank:
+                return float(bound)
+        return self.max
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total,
+            "avg_ms": self.total / self.count if self.count else 0.0,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {f"le_{bound}": value for bound, value in zip(BUCKETS_MS, self.buckets)}
+                       | {"inf": self.buckets[-1]},
+        }
+
+
+class QueryStats:
+    """
+    Учет времени выполнения SQL-запросов через события SQLAlchemy вместо echo=True.
+
+    Время каждого запроса попадает в гистограмму его отпечатка. В лог пишутся только
+    запросы медленнее slow_ms и случайная выборка остальных с долей sample_rate.
+    Количество отпечатков ограничено max_fingerprints, запросы сверх лимита учитываются вместе.
+    """
+
+    def __init__(self, slow_ms: float = 200.0, sample_rate: float = 0.0, max_fingerprints: int = 500):
+        """
+        :param slow_ms: Порог в миллисекундах, начиная с которого запрос пишется в лог как медленный.
+        :param sample_rate: Доля остальных запросов, которые пишутся в лог, от 0 до 1.
+        :param max_fingerprints: Максимальное количество отдельно учитываемых отпечатков запросов.
+        """
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.max_fingerprints = max_fingerprints
+        self.histograms: dict[str, StatementHistogram] = {}
+        self._fingerprints: dict[str, str] = {}
+        self.slow = 0
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """Подписывается на выполнение запросов движка"""
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        context._query_started = perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = getattr(context, "_query_started", None)
+        if started is not None:
+            self.record(statement, (perf_counter() - started) * 1000)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        """Учитывает выполненный запрос и при необходимости пишет его в лог"""
+        key = self._fingerprints.get(statement)
+        if key is None:
+            key = fingerprint(statement)
+            if len(self._fingerprints) < self.max_fingerprints * 4:
+                self._fingerprints[statement] = key
+
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            if len(self.histograms) >= self.max_fingerprints:
+                key = OTHER_FINGERPRINT
+            histogram = self.histograms.setdefault(key, StatementHistogram())
+        histogram.add(elapsed_ms)
+
+        if elapsed_ms >= self.slow_ms:
+            self.slow += 1
+            logger.warning(f"Slow query {elapsed_ms:.1f} ms: {statement}")
+        elif self.sample_rate and random.random() < self.sample_rate:
+            logger.info(f"Query {elapsed_ms:.1f} ms: {statement}")
+
+    def stats(self, limit: int = 20, order_by: str = "total_ms") -> dict:
+        """
+        Возвращает гистограммы самых затратных отпечатков запросов.
+
+        :param limit: Количество отпечатков в ответе.
+        :param order_by: Показатель для сортировки: total_ms, avg_ms, max_ms или count.
+        :return: Общие счетчики и гистограммы отпечатков, отсортированные по убыванию показателя.
+        """
+        statements = sorted(
+            ({"fingerprint": key, **histogram.stats()} for key, histogram in self.histograms.items()),
+            key=lambda item: item[order_by],
+            reverse=True,
+        )
+        return {
+            "slow_ms": self.slow_ms,
+            "sample_rate": self.sample_rate,
+            "queries": sum(histogram.count for histogram in self.histograms.values()),
+            "slow": self.slow,
+            "fingerprints": len(self.histograms),
+            "statements": statements[:limit],
+        }
+
+    def reset(self) -> None:
+        """Сбрасывает накопленные показатели"""
+        self.histograms.clear()
+        self._fingerprints.clear()
+        self.slow = 0
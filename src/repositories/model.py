@@ -1,4 +1,5 @@
-from sqlalchemy import String, Float, DateTime, ForeignKey, Enum as SqlAlchemyEnum
+from sqlalchemy import DDL, String, Float, Integer, DateTime, ForeignKey, Index, Computed, Enum as SqlAlchemyEnum, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, declared_attr, Mapped, mapped_column, relationship
 
 from src.schemas import AccessLevel
@@ -22,24 +23,69 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
     password_hash: Mapped[str] = mapped_column(String(100), nullable=False)
     role: Mapped[AccessLevel] = mapped_column(SqlAlchemyEnum(AccessLevel), nullable=False, default=AccessLevel.user)
+    role_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(),  nullable=False)
     deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
     articles = relationship("Article", back_populates="user")
+    stats = relationship("AuthorStats", uselist=False, viewonly=True)
+
+
+# Любая смена роли, в том числе напрямую в базе данных, увеличивает версию роли:
+# токены доступа с прежней ролью перестают приниматься (см. AuthorizationService.require_role)
+USERS_ROLE_VERSION_DDL = (
+    DDL(
+        "CREATE OR REPLACE FUNCTION users_bump_role_version() RETURNS trigger AS $$ "
+        "BEGIN NEW.role_version := OLD.role_version + 1; RETURN NEW; END; "
+        "$$ LANGUAGE plpgsql"
+    ),
+    DDL("DROP TRIGGER IF EXISTS users_role_version ON users"),
+    DDL(
+        "CREATE TRIGGER users_role_version BEFORE UPDATE OF role ON users FOR EACH ROW "
+        "WHEN (OLD.role IS DISTINCT FROM NEW.role) EXECUTE FUNCTION users_bump_role_version()"
+    ),
+)
+for ddl in USERS_ROLE_VERSION_DDL:
+    event.listen(User.__table__, "after_create", ddl.execute_if(dialect="postgresql"))
 
 
 class Article(Base):
+    __table_args__ = (
+        Index("ix_articles_created_at_id", "created_at", "id"),
+        Index("ix_articles_author_id_created_at_id", "author_id", "created_at", "id"),
+        Index("ix_articles_rating", "rating"),
+        Index("ix_articles_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, unique=True)
     title: Mapped[str] = mapped_column(String(100), nullable=False)
     text: Mapped[str] = mapped_column(String(10000), nullable=False)
     author_id: Mapped[UUID] = mapped_column(ForeignKey('users.uuid'), nullable=True)
     rating: Mapped[float] = mapped_column(Float, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', text), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     user = relationship("User", back_populates="articles")
 
 
+class AuthorStats(Base):
+    __tablename__ = "author_stats"
+
+    author_id: Mapped[UUID] = mapped_column(ForeignKey('users.uuid', ondelete="CASCADE"), primary_key=True)
+    article_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    last_published_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+
 class Refresh(Base):
     user_uuid: Mapped[UUID] = mapped_column(ForeignKey('users.uuid'), unique=True, primary_key=True, nullable=False)
     token: Mapped[str] = mapped_column(String(), nullable=False)
@@ -0,0 +1,46 @@
+from time import perf_counter
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который считает выдачи соединений, время ожидания свободного соединения
+    и превышения pool_timeout. Время выдачи включает открытие нового соединения,
+    если пул еще не заполнен.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = perf_counter() - start
+            self.checkouts += 1
+            self.wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+
+    def stats(self) -> dict:
+        """Возвращает текущее состояние пула и накопленные показатели ожидания соединений"""
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_time_total": self.wait_time,
+            "wait_time_avg": self.wait_time / self.checkouts if self.checkouts else 0.0,
+            "wait_time_max": self.max_wait_time,
+        }
@@ -0,0 +1,60 @@
+from sqlalchemy import Row
+
+from src.schemas import Article, ArticleAuthor, ArticlePartial, ArticleWithAuthor, UserOut, UserProfile, UserStats
+from .model import Article as ArticleModel, AuthorStats, User as UserModel
+
+# Чтение идет через Core select() по явному списку колонок: строки результата - легкие
+# кортежи Row без ORM-сущностей, identity map и состояния атрибутов. Схемы собираются
+# через model_construct без повторной валидации, потому что значения пришли из базы данных
+# с уже проверенными типами. Запись по-прежнему выполняется через ORM.
+
+ARTICLE_COLUMNS = tuple(ArticleModel.__table__.c[name] for name in Article.model_fields)
+AUTHOR_COLUMNS = (UserModel.name.label("author_name"), UserModel.role.label("author_role"))
+USER_COLUMNS = tuple(UserModel.__table__.c[name] for name in UserOut.model_fields)
+USER_STATS_COLUMNS = (AuthorStats.article_count, AuthorStats.rating_sum, AuthorStats.last_published_at)
+
+
+def article_from_row(row: Row) -> Article:
+    """Собирает статью из строки с колонками ARTICLE_COLUMNS"""
+    mapping = row._mapping
+    return Article.model_construct(**{name: mapping[name] for name in Article.model_fields})
+
+
+def article_with_author_from_row(row: Row) -> ArticleWithAuthor:
+    """Собирает статью с автором из строки с колонками ARTICLE_COLUMNS и AUTHOR_COLUMNS"""
+    mapping = row._mapping
+    author = None
+    if mapping["author_name"] is not None:
+        author = ArticleAuthor.model_construct(name=mapping["author_name"], role=mapping["author_role"])
+    return ArticleWithAuthor.model_construct(
+        **{name: mapping[name] for name in Article.model_fields},
+        author=author,
+    )
+
+
+def partial_article_from_row(row: Row, fields) -> ArticlePartial:
+    """Собирает статью только с указанными полями, остальные поля считаются незаданными"""
+    mapping = row._mapping
+    return ArticlePartial.model_construct(**{name: mapping[name] for name in fields})
+
+
+def user_from_row(row: Row) -> UserOut:
+    """Собирает пользователя из строки с колонками USER_COLUMNS"""
+    mapping = row._mapping
+    return UserOut.model_construct(**{name: mapping[name] for name in UserOut.model_fields})
+
+
+def user_profile_from_row(row: Row) -> UserProfile:
+    """Собирает профиль пользователя из строки с колонками USER_COLUMNS и USER_STATS_COLUMNS"""
+    mapping = row._mapping
+    stats = UserStats()
+    if mapping["article_count"] is not None:
+        stats = UserStats.model_construct(
+            article_count=mapping["article_count"],
+            rating_sum=mapping["rating_sum"],
+            last_published_at=mapping["last_published_at"],
+        )
+    return UserProfile.model_construct(
+        **{name: mapping[name] for name in UserOut.model_fields},
+        stats=stats,
+    )
@@ -0,0 +1,121 @@
+from uuid import UUID
+
+from sqlalchemy import select, func, literal, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .model import Article as ArticleModel, AuthorStats
+
+
+class AuthorStatsRepository:
+    """
+    Репозиторий агрегатов по авторам: количество статей, сумма рейтингов и время последней публикации.
+
+    Агрегаты хранятся в таблице author_stats и изменяются на разницу при каждой записи статьи
+    в той же транзакции, поэтому для их чтения не нужен GROUP BY по таблице статей. Методы не
+    фиксируют транзакцию и не обрабатывают ошибки - это делает вызывающий метод репозитория статей.
+    """
+
+    @staticmethod
+    def _last_published():
+        """
+        Подзапрос времени последней статьи автора строки author_stats,
+        выполняется по индексу (author_id, created_at, id)
+        """
+        return (
+            select(func.max(ArticleModel.created_at))
+            .where(ArticleModel.author_id == AuthorStats.author_id)
+            .scalar_subquery()
+        )
+
+    async def apply(self, session: AsyncSession, deltas: dict[UUID, tuple[int, float]]) -> None:
+        """
+        Прибавляет к агрегатам авторов изменения количества статей и суммы рейтингов.
+        Одна команда INSERT ... ON CONFLICT DO UPDATE на всех авторов.
+
+        Время последней публикации пересчитывается подзапросом по индексу, поэтому остается
+        верным и после удаления статьи или её переноса к другому автору. Пересчет выполняется
+        отдельной командой UPDATE уже после блокировки строк авторов: ее снимок видит статьи
+        транзакций, которые держали эти строки и успели зафиксироваться. Подзапрос внутри
+        INSERT видел бы снимок до ожидания блокировки и мог бы записать более старое время.
+
+        :param session: Асинхронная сессия, в транзакции которой изменены статьи.
+        :param deltas: Изменения (количество статей, сумма рейтингов) по ID автора.
+        """
+        # Авторы в одном порядке, чтобы параллельные транзакции блокировали строки одинаково и не взаимоблокировались
+        author_ids = sorted(author_id for author_id in deltas if author_id is not None)
+        if not author_ids:
+            return
+
+        rows = [
+            {
+                "author_id": author_id,
+                "article_count": deltas[author_id][0],
+                "rating_sum": deltas[author_id][1],
+            }
+            for author_id in author_ids
+        ]
+
+        stmt = insert(AuthorStats).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AuthorStats.author_id],
+            set_={
+                "article_count": AuthorStats.article_count + stmt.excluded.article_count,
+                "rating_sum": AuthorStats.rating_sum + stmt.excluded.rating_sum,
+            },
+        )
+        await session.execute(stmt)
+        await session.execute(
+            update(AuthorStats)
+            .where(AuthorStats.author_id.in_(author_ids))
+            .values(last_published_at=self._last_published())
+        )
+
+    async def article_created(self, session: AsyncSession, author_id: UUID | None, rating: float) -> None:
+        """Учитывает новую статью автора"""
+        await self.apply(session, {author_id: (1, rating)})
+
+    async def articles_created(self, session: AsyncSession, articles: list[tuple[UUID | None, float]]) -> None:
+        """Учитывает пакет новых статей: пары (ID автора, рейтинг)"""
+        deltas: dict[UUID, tuple[int, float]] = {}
+        for author_id, rating in articles:
+            count, rating_sum = deltas.get(author_id, (0, 0.0))
+            deltas[author_id] = (count + 1, rating_sum + rating)
+        await self.apply(session, deltas)
+
+    async def article_updated(self, session: AsyncSession, old_author_id: UUID | None, old_rating: float,
+                              new_author_id: UUID | None, new_rating: float) -> None:
+        """Учитывает изменение автора, рейтинга или даты создания статьи"""
+        if old_author_id == new_author_id:
+            await self.apply(session, {new_author_id: (0, new_rating - old_rating)})
+        else:
+            await self.apply(session, {old_author_id: (-1, -old_rating), new_author_id: (1, new_rating)})
+
+    async def article_deleted(self, session: AsyncSession, author_id: UUID | None, rating: float) -> None:
+        """Учитывает удаление статьи автора"""
+        await self.apply(session, {author_id: (-1, -rating)})
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """
+        Заполняет агрегаты по текущим статьям, если таблица author_stats пуста.
+        Выполняет полный GROUP BY по статьям, поэтому предназначен только для запуска приложения
+        после появления таблицы. Фиксирует транзакцию.
+        """
+        if await session.scalar(select(AuthorStats.author_id).limit(1)) is not None:
+            return
+
+        aggregates = (
+            select(
+                ArticleModel.author_id,
+                func.count(),
+                func.coalesce(func.sum(ArticleModel.rating), literal(0.0)),
+                func.max(ArticleModel.created_at),
+            )
+            .where(ArticleModel.author_id.is_not(None))
+            .group_by(ArticleModel.author_id)
+        )
+        stmt = insert(AuthorStats).from_select(
+            ["author_id", "article_count", "rating_sum", "last_published_at"], aggregates
+        ).on_conflict_do_nothing(index_elements=[AuthorStats.author_id])
+        await session.execute(stmt)
+        await session.commit()
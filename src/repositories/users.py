@@ -1,35 +1,47 @@
+from typing import AsyncIterator
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, Sequence
+from sqlalchemy import or_, select, update
+from uuid import UUID
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
 
-from src.repositories import User
+from src.repositories import User, AuthorStats
+from src.schemas import AccessLevel, UserOut, UserProfile
+from .rows import USER_COLUMNS, USER_STATS_COLUMNS, user_from_row, user_profile_from_row
 
 
 class UserRepository:
     """
     Репозиторий для работы с пользователями. Содержит методы для получения одного пользователя
     по имени, а также для получения списка всех пользователей.
+    Чтение идет через Core select() по явному списку колонок (см. rows.py).
     """
 
-    async def get_user(self, username: str, session: AsyncSession) -> User:
+    async def get_user(self, username: str, session: AsyncSession) -> UserProfile | None:
         """
-        Получает пользователя по имени.
+        Получает пользователя по имени вместе с агрегатами по его статьям.
+        Агрегаты читаются из author_stats тем же запросом через LEFT OUTER JOIN.
 
         :param username: Имя пользователя для поиска.
         :param session: Асинхронная сессия для работы с базой данных.
         :return: Данные пользователя, если он найден.
         :raises HTTPException: Ошибка сервера, если произошла ошибка при выполнении запроса.
         """
-        stmt = select(User).where(User.name == username).limit(1)
+        stmt = (
+            select(*USER_COLUMNS, *USER_STATS_COLUMNS)
+            .outerjoin(AuthorStats, AuthorStats.author_id == User.uuid)
+            .where(User.name == username)
+            .limit(1)
+        )
         try:
             result = await session.execute(stmt)
-            user = result.scalars().first()
-            return user
+            row = result.first()
+            return user_profile_from_row(row) if row is not None else None
         except SQLAlchemyError as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    async def get_users(self, session: AsyncSession) -> Sequence[User]:
+    async def get_users(self, session: AsyncSession) -> list[UserOut]:
         """
         Получает список всех пользователей, отсортированных по UUID.
 
@@ -37,10 +49,120 @@ class UserRepository:
         :return: Список всех пользователей.
         :raises HTTPException: Ошибка сервера, если произошла ошибка при выполнении запроса.
         """
-        stmt = select(User).order_by(User.uuid)
+        stmt = select(*USER_COLUMNS).order_by(User.uuid)
         try:
             res = await session.execute(stmt)
-            users = res.scalars().all()
-            return users
+            return [user_from_row(row) for row in res]
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def stream_users(self, session: AsyncSession, chunk_size: int = 500) -> AsyncIterator[list[UserOut]]:
+        """
+        Потоково читает всех пользователей через серверный курсор, порциями по chunk_size строк.
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :param chunk_size: Количество строк, получаемых из базы данных за одну порцию.
+        :return: Асинхронный итератор порций пользователей, отсортированных по UUID.
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при выполнении запроса.
+        """
+        stmt = select(*USER_COLUMNS).order_by(User.uuid).execution_options(yield_per=chunk_size)
+        try:
+            result = await session.stream(stmt)
+            async for partition in result.partitions():
+                yield [user_from_row(row) for row in partition]
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def find_taken(self, session: AsyncSession, name: str | None = None,
+                         email: str | None = None) -> tuple[bool, bool]:
+        """
+        Проверяет, заняты ли имя и адрес электронной почты. Запрос идет по уникальным индексам
+        name и email и читает не больше двух строк.
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :param name: Имя для проверки. None - не проверять.
+        :param email: Адрес электронной почты для проверки. None - не проверять.
+        :return: Занято ли имя и занят ли адрес электронной почты.
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при выполнении запроса.
+        """
+        conditions = []
+        if name is not None:
+            conditions.append(User.name == name)
+        if email is not None:
+            conditions.append(User.email == email)
+        if not conditions:
+            return False, False
+
+        stmt = select(User.name, User.email).where(or_(*conditions)).limit(2)
+        try:
+            rows = (await session.execute(stmt)).all()
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return (
+            name is not None and any(row.name == name for row in rows),
+            email is not None and any(row.email == email for row in rows),
+        )
+
+    async def stream_identities(self, session: AsyncSession, chunk_size: int = 5000) -> AsyncIterator[list[tuple[str, str]]]:
+        """
+        Потоково читает имена и адреса электронной почты всех пользователей порциями по chunk_size строк.
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :param chunk_size: Количество строк, получаемых из базы данных за одну порцию.
+        :return: Асинхронный итератор порций пар (имя, адрес электронной почты).
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при выполнении запроса.
+        """
+        stmt = select(User.name, User.email).execution_options(yield_per=chunk_size)
+        try:
+            result = await session.stream(stmt)
+            async for partition in result.partitions():
+                yield [(row.name, row.email) for row in partition]
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def get_role(self, session: AsyncSession, user_uuid: UUID) -> tuple[AccessLevel, int] | None:
+        """
+        Получает текущую роль пользователя и версию роли по первичному ключу.
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :param user_uuid: UUID пользователя.
+        :return: Роль и версия роли или None, если пользователь не найден.
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при выполнении запроса.
+        """
+        stmt = select(User.role, User.role_version).where(User.uuid == user_uuid)
+        try:
+            row = (await session.execute(stmt)).first()
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return (row.role, row.role_version) if row is not None else None
+
+    async def set_role(self, session: AsyncSession, user_uuid: UUID, role: AccessLevel) -> int:
+        """
+        Меняет роль пользователя и увеличивает версию роли, чтобы выданные ранее токены доступа
+        с прежней ролью перестали приниматься. Триггер users_role_version увеличивает версию так же
+        при смене роли в обход этого метода; повторно она не увеличивается.
+
+        :param session: Асинхронная сессия для работы с базой данных.
+        :param user_uuid: UUID пользователя.
+        :param role: Новая роль.
+        :return: Новая версия роли.
+        :raises HTTPException: Ошибка 404, если пользователь не найден.
+        :raises HTTPException: Ошибка сервера, если произошла ошибка при выполнении запроса.
+        """
+        stmt = (
+            update(User)
+            .where(User.uuid == user_uuid)
+            .values(role=role, role_version=User.role_version + 1)
+            .returning(User.role_version)
+        )
+        try:
+            role_version = (await session.execute(stmt)).scalar_one_or_none()
+            if role_version is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+            await session.commit()
+            return role_version
         except SQLAlchemyError as e:
+            await session.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -3,8 +3,10 @@ from  fastapi import APIRouter
 from .articles import router as article_router
 from .auth import router as auth_router
 from .users import router as users_router
+from .metrics import router as metrics_router
 
 router = APIRouter()
 router.include_router(article_router, prefix="/article")
 router.include_router(auth_router, prefix="/auth")
-router.include_router(users_router, prefix="/users")
\ No newline at end of file
+router.include_router(users_router, prefix="/users")
+router.include_router(metrics_router, prefix="/metrics")
\ No newline at end of file
@@ -1,33 +1,160 @@
-from fastapi import APIRouter, Depends, Header
-from sqlalchemy.ext.asyncio import AsyncSession
-from src.schemas.articles import Article, ArticleCreate, ArticleUpdate
-from src.services import ArticleService, AuthenticationService, authorization
-from src.depends import get_articles_service, get_session, get_authentication_service
+from datetime import datetime
+from functools import partial
+from typing import Any
+from uuid import UUID
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.schemas.articles import Article, ArticleCreate, ArticleUpdate, ArticlePage, ArticleField, ArticleBulkResult, ArticleFilter, ArticleEmbed
+from src.services import ArticleService, AuthenticationService, RenderedCache, authorization
+from src.depends import (
+    get_articles_service, get_session, get_read_session, get_authentication_service, get_read_session_factory,
+    get_rendered_cache,
+)
+from .responses import FastJSONResponse, render_response, rendered_response
+from .conditional import make_etag, is_not_modified, not_modified_response
+from .streaming import stream_records, wants_ndjson
 
 
 
 router = APIRouter(tags=["article"])
 
 
+async def get_article_filter(author_id: UUID | None = Query(None),
+                             min_rating: float | None = Query(None, ge=0.0, le=5.0),
+                             max_rating: float | None = Query(None, ge=0.0, le=5.0),
+                             created_after: datetime | None = Query(None),
+                             created_before: datetime | None = Query(None),
+                             ) -> ArticleFilter:
+    """Собирает фильтры списка статей из параметров запроса"""
+    return ArticleFilter(author_id=author_id, min_rating=min_rating, max_rating=max_rating,
+                         created_after=created_after, created_before=created_before)
+
 @router.get("/",
-            response_model=list[Article],
+            response_model=ArticlePage,
+            response_model_exclude_unset=True,
             )
-async def get_articles(article_service: ArticleService = Depends(get_articles_service),
-                       session: AsyncSession = Depends(get_session)
+async def get_articles(request: Request,
+                       limit: int = Query(20, ge=1, le=100),
+                       cursor: str | None = Query(None),
+                       fields: list[ArticleField] | None = Query(None),
+                       filters: ArticleFilter = Depends(get_article_filter),
+                       embed: list[ArticleEmbed] | None = Query(None),
+                       stream: bool = Query(False),
+                       article_service: ArticleService = Depends(get_articles_service),
+                       rendered: RenderedCache = Depends(get_rendered_cache),
+                       session: AsyncSession = Depends(get_read_session),
+                       session_factory: async_sessionmaker = Depends(get_read_session_factory),
                        ):
-    """Возращает список всех статей"""
-    return await article_service.get_articles(session)
+    """
+    Возращает страницу статей, от новых к старым
+    Для получения следующей страницы передайте next_cursor из ответа в параметре cursor
+    Параметр fields (можно повторять) ограничивает набор возвращаемых полей статьи, id возвращается всегда
+    Параметры author_id, min_rating, max_rating, created_after и created_before фильтруют список
+    Параметр embed=author добавляет к каждой статье имя и роль автора (не используется вместе с fields)
+    С заголовком "Accept: application/x-ndjson" или параметром stream=true возвращает все статьи
+    потоком (NDJSON или JSON-массив соответственно), без пагинации
+    Отдает ETag страницы и отвечает 304, если страница не изменилась с прошлого запроса клиента
+    Закодированная страница кэшируется до ближайшего изменения статей
+    """
+    ndjson = wants_ndjson(request)
+    if ndjson or stream:
+        return stream_records(session_factory, partial(article_service.stream_articles, filters=filters), Article,
+                              ndjson=ndjson)
+
+    field_names = tuple(field.value for field in fields) if fields else None
+    embed_author = bool(embed and ArticleEmbed.author in embed)
+    key = (limit, cursor, field_names, tuple(filters), embed_author)
+    cached = rendered.get_page(key)
+    if cached is None:
+        generation = rendered.generation
+        page = ArticlePage.model_validate(
+            await article_service.get_articles(session, limit=limit, cursor=cursor,
+                                               fields=list(field_names) if field_names else None,
+                                               filters=filters, embed_author=embed_author)
+        )
+        etag = make_etag(page.next_cursor, *(tuple(item) for item in page.items))
+        cached = render_response(page, etag, exclude_unset=True)
+        rendered.set_page(key, cached, generation)
+
+    if is_not_modified(request, cached.etag):
+        return not_modified_response(cached.etag)
+
+    return rendered_response(cached)
+
+
+@router.get("/search",
+            response_model=ArticlePage,
+            )
+async def search_articles(q: str = Query(..., min_length=1, max_length=200),
+                          limit: int = Query(20, ge=1, le=100),
+                          cursor: str | None = Query(None),
+                          article_service: ArticleService = Depends(get_articles_service),
+                          session: AsyncSession = Depends(get_read_session)
+                          ):
+    """
+    Полнотекстовый поиск статей по заголовку и тексту
+    Статьи отсортированы по релевантности, совпадения в заголовке важнее совпадений в тексте
+    """
+    return FastJSONResponse(await article_service.search_articles(session, query=q, limit=limit, cursor=cursor))
+
+
+@router.get("/top",
+            response_model=list[Article],
+            )
+async def get_top_articles(limit: int = Query(10, ge=1, le=100),
+                           article_service: ArticleService = Depends(get_articles_service),
+                           session: AsyncSession = Depends(get_read_session)
+                           ):
+    """
+    Возращает статьи с наибольшим рейтингом
+    """
+    return FastJSONResponse(await article_service.get_top_articles(session, limit=limit))
+
+
+@router.get("/trending",
+            response_model=list[Article],
+            )
+async def get_trending_articles(limit: int = Query(10, ge=1, le=100),
+                                article_service: ArticleService = Depends(get_articles_service),
+                                session: AsyncSession = Depends(get_read_session)
+                                ):
+    """
+    Возращает статьи "в тренде": рейтинг статьи уменьшается вдвое за каждый период TRENDING_HALF_LIFE с её создания
+    """
+    return FastJSONResponse(await article_service.get_trending_articles(session, limit=limit))
 
 
 @router.get("/{article_id}",
             response_model=Article,
             )
 async def get_article(article_id: int,
+                      request: Request,
                       article_service: ArticleService = Depends(get_articles_service),
-                      session: AsyncSession = Depends(get_session)
+                      rendered: RenderedCache = Depends(get_rendered_cache),
+                      session: AsyncSession = Depends(get_read_session)
                       ):
-    """Возращает статью по ID"""
-    return await article_service.get_article_by_id(session=session, article_id=article_id)
+    """
+    Возращает статью по ID
+    Отдает ETag и Last-Modified и отвечает 304, если статья не изменилась с прошлого запроса клиента
+    Закодированный ответ кэшируется: повторные запросы не обращаются к базе данных и не сериализуют статью заново
+    """
+    cached = rendered.get_article(article_id)
+    if cached is None:
+        generation = rendered.generation
+        article = await article_service.get_article_by_id(session=session, article_id=article_id)
+        if article is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Article not found")
+
+        article = Article.model_validate(article)
+        cached = render_response(article, make_etag(article.id, article.version),
+                                 article.updated_at or article.created_at)
+        rendered.set_article(article_id, cached, generation)
+
+    if is_not_modified(request, cached.etag, cached.last_modified):
+        return not_modified_response(cached.etag, cached.last_modified)
+
+    return rendered_response(cached)
 
 
 @router.post("/",
@@ -44,6 +171,23 @@ async def create_article(article_in: ArticleCreate,
     return await articles_service.create_article(session=session, article_in=article_in)
 
 
+@router.post("/bulk",
+             response_model=ArticleBulkResult
+             )
+@authorization.require_role("admin")
+async def create_articles(articles_in: list[dict[str, Any]] = Body(..., min_length=1, max_length=10000),
+                          articles_service: ArticleService = Depends(get_articles_service),
+                          x_access_token: str = Header(None),
+                          auth_service: AuthenticationService = Depends(get_authentication_service),
+                          session: AsyncSession = Depends(get_session)
+                          ):
+    """
+    Создает статьи пакетом в одной транзакции
+    Невалидные статьи возвращаются в errors с индексом во входном списке, остальные создаются
+    """
+    return await articles_service.create_articles(session=session, articles_in=articles_in)
+
+
 @router.put("/",
             response_model=Article
             )
@@ -54,7 +198,10 @@ async def update_article(article_update: ArticleUpdate,
                          articles_service: ArticleService = Depends(get_articles_service),
                          session: AsyncSession = Depends(get_session)
                          ):
-    """Обновляет существующую статью"""
+    """
+    Обновляет существующую статью
+    Поле version должно совпадать с текущей версией статьи, иначе возвращается 409
+    """
     return await articles_service.update_article(session=session, article_update=article_update,
                                                  article_id=article_update.id)
 
@@ -22,7 +22,7 @@ async def auth(user_data: OAuth2PasswordRequestForm = Depends(),
         user = await authentication_service.verify_user(user_data=user_data, session=session)
 
         if user:
-            access_token = await authentication_service.create_access_token(data={"sub": user.uuid})
+            access_token = await authentication_service.create_access_token(data={"sub": user.uuid}, session=session)
             refresh_token = await authentication_service.create_refresh_token(data={"sub": user.uuid}, session=session)
             json_user_data = jsonable_encoder(user)
             return JSONResponse(
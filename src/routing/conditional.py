@@ -0,0 +1,59 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """Вычисляет строгий ETag по значениям, от которых зависит представление ресурса"""
+    return '"%s"' % hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def format_http_date(value: datetime) -> str:
+    """Форматирует дату для заголовка Last-Modified"""
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: datetime | None = None) -> dict[str, str]:
+    """Возвращает заголовки ETag и Last-Modified для ответа"""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """
+    Проверяет условные заголовки запроса.
+
+    If-None-Match имеет приоритет над If-Modified-Since, как того требует RFC 9110.
+
+    :param request: Входящий запрос.
+    :param etag: Текущий ETag ресурса.
+    :param last_modified: Время последнего изменения ресурса, если известно.
+    :return: True, если у клиента актуальная версия и можно ответить 304.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    return last_modified.astimezone(timezone.utc).replace(microsecond=0) <= since
+
+
+def not_modified_response(etag: str, last_modified: datetime | None = None) -> Response:
+    """Формирует ответ 304 Not Modified без тела"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(etag, last_modified))
@@ -0,0 +1,47 @@
+from http.cookies import SimpleCookie
+from math import ceil
+from time import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.depends import READ_PRIMARY_COOKIE
+from src.repositories import db
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Вход и обновление токена пишут только refresh-токен, который клиент не читает через реплики
+NO_READ_AFTER_WRITE_PATHS = frozenset({"/auth/", "/auth/refresh"})
+
+
+class ReadYourWritesMiddleware:
+    """
+    После успешного изменяющего запроса направляет чтения этого клиента в основную базу данных,
+    пока реплики могут еще не получить изменения.
+
+    Длительность окна - db.primary_window. Клиенту ставится cookie со временем окончания окна, get_read_session читает его и выбирает
+    основную базу данных. Чтения остальных клиентов продолжают идти в реплики, а кэши статей
+    не заполняются прочитанным из реплик, пока не пройдет окно после изменения статьи (см. ArticleService).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        window = db.primary_window
+        if (scope["type"] != "http" or scope["method"] in SAFE_METHODS or window <= 0
+                or scope["path"] in NO_READ_AFTER_WRITE_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = SimpleCookie()
+                cookie[READ_PRIMARY_COOKIE] = str(time() + window)
+                cookie[READ_PRIMARY_COOKIE]["max-age"] = ceil(window)
+                cookie[READ_PRIMARY_COOKIE]["path"] = "/"
+                cookie[READ_PRIMARY_COOKIE]["httponly"] = True
+                cookie[READ_PRIMARY_COOKIE]["samesite"] = "lax"
+                header = cookie.output(header="").strip().encode("latin-1")
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", header)]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
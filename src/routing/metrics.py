@@ -0,0 +1,58 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.depends import get_session, get_articles_service, get_authentication_service, get_registration_service
+from src.repositories import db
+from src.services import ArticleService, AuthenticationService, RegistrationService, authorization
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/",
+            response_model=dict)
+@authorization.require_role("superuser")
+async def get_metrics(x_access_token: str = Header(None),
+                      auth_service: AuthenticationService = Depends(get_authentication_service),
+                      article_service: ArticleService = Depends(get_articles_service),
+                      registration_service: RegistrationService = Depends(get_registration_service),
+                      session: AsyncSession = Depends(get_session),
+                      ):
+    """
+    Возвращает текущие показатели кэшей сервиса и пулов соединений с базой данных
+    Доступно только для пользователей с ролью "superuser"
+    """
+    return {
+        "article_cache": article_service.cache.stats(),
+        "rendered_cache": article_service.rendered.stats(),
+        "article_reads": article_service.inflight.stats(),
+        "db_pool": db.pool_stats(),
+        "db_queries": db.query_stats.stats(limit=10),
+        "password_hashing": auth_service.hasher.stats(),
+        "registration": registration_service.stats(),
+        "role_cache": auth_service.roles.stats(),
+        "token_cache": auth_service.token_service.cache.stats(),
+        "jwt_keys": auth_service.token_service.keys.stats(),
+    }
+
+
+@router.get("/queries",
+            response_model=dict)
+@authorization.require_role("superuser")
+async def get_query_metrics(limit: int = Query(20, ge=1, le=500),
+                            order_by: Literal["total_ms", "avg_ms", "max_ms", "count"] = Query("total_ms"),
+                            reset: bool = Query(False),
+                            x_access_token: str = Header(None),
+                            auth_service: AuthenticationService = Depends(get_authentication_service),
+                            session: AsyncSession = Depends(get_session),
+                            ):
+    """
+    Возвращает гистограммы времени выполнения SQL-запросов по отпечаткам, самые затратные первыми
+    Параметр reset=true сбрасывает накопленные показатели после ответа
+    Доступно только для пользователей с ролью "superuser"
+    """
+    stats = db.query_stats.stats(limit=limit, order_by=order_by)
+    if reset:
+        db.query_stats.reset()
+    return stats
@@ -0,0 +1,58 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from src.services import RenderedResponse
+from .conditional import validator_headers
+
+
+@lru_cache(maxsize=64)
+def _list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    JSON-ответ для данных, которые уже прошли через схемы в репозиториях и сервисах.
+
+    Маршрут, возвращающий такой ответ, минует повторную валидацию по response_model и
+    jsonable_encoder: схемы раскладываются в словари одним вызовом model_dump, а datetime,
+    UUID и Enum кодирует сам orjson сразу в байты. response_model в декораторе маршрута
+    остается только для документации OpenAPI.
+    """
+
+    def __init__(self, content: Any, exclude_unset: bool = False, **kwargs):
+        """
+        :param content: Схема, список схем одного типа или данные, которые orjson кодирует напрямую.
+        :param exclude_unset: Не выводить поля схем, которые не были заданы явно.
+        :param kwargs: Параметры JSONResponse: status_code, headers и т.д.
+        """
+        self.exclude_unset = exclude_unset
+        super().__init__(content, **kwargs)
+
+    def _default(self, value: Any) -> Any:
+        if isinstance(value, BaseModel):
+            return value.model_dump(exclude_unset=self.exclude_unset)
+        raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, list) and content and isinstance(content[0], BaseModel):
+            content = _list_adapter(type(content[0])).dump_python(content, exclude_unset=self.exclude_unset)
+        return orjson.dumps(content, default=self._default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def render_response(content: Any, etag: str, last_modified: datetime | None = None,
+                    exclude_unset: bool = False) -> RenderedResponse:
+    """Кодирует ответ в байты один раз, чтобы сохранить его в кэше вместе с валидаторами"""
+    return RenderedResponse(FastJSONResponse(content, exclude_unset=exclude_unset).body, etag, last_modified)
+
+
+def rendered_response(rendered: RenderedResponse) -> Response:
+    """Отдает сохраненные байты как есть, без повторной сериализации"""
+    return Response(rendered.body, media_type="application/json",
+                    headers=validator_headers(rendered.etag, rendered.last_modified))
@@ -0,0 +1,47 @@
+from typing import AsyncIterator, Callable
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Проверяет, запросил ли клиент ответ в формате NDJSON через заголовок Accept"""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def stream_records(session_factory: async_sessionmaker,
+                   produce: Callable[[AsyncSession], AsyncIterator[list]],
+                   schema: type[BaseModel],
+                   ndjson: bool,
+                   ) -> StreamingResponse:
+    """
+    Формирует потоковый ответ из порций записей, не собирая весь список в памяти.
+
+    Сессия открывается внутри генератора, потому что зависимости FastAPI закрываются
+    до того, как начнется отправка тела ответа.
+
+    :param session_factory: Фабрика сессий для чтения данных.
+    :param produce: Функция, возвращающая асинхронный итератор порций записей для сессии.
+    :param schema: Схема, через которую сериализуется каждая запись.
+    :param ndjson: True - одна запись JSON на строку, False - JSON-массив.
+    :return: Потоковый ответ.
+    """
+    async def body() -> AsyncIterator[str]:
+        async with session_factory() as session:
+            if ndjson:
+                async for chunk in produce(session):
+                    yield "".join(schema.model_validate(record).model_dump_json() + "\n" for record in chunk)
+                return
+
+            separator = "["
+            async for chunk in produce(session):
+                if chunk:
+                    yield separator + ",".join(schema.model_validate(record).model_dump_json() for record in chunk)
+                    separator = ","
+            yield "[]" if separator == "[" else "]"
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE if ndjson else "application/json")
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, Header
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from uuid import UUID
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Body, Depends, Header, Query, Request
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from ..config import logger
-from src.depends import get_session, get_users_service, get_authentication_service
-from src.schemas import UserOut
-from src.services import UserService, AuthenticationService, authorization
+from src.depends import (
+    get_session, get_read_session, get_users_service, get_authentication_service, get_read_session_factory,
+    get_articles_service,
+)
+from src.schemas import AccessLevel, UserOut, ArticlePage
+from src.services import UserService, AuthenticationService, ArticleService, authorization
+from .responses import FastJSONResponse
+from .streaming import stream_records, wants_ndjson
 
 router = APIRouter(tags=["users"])
 
@@ -15,17 +20,65 @@ router = APIRouter(tags=["users"])
 @router.get("/users/all",
             response_model=list[UserOut])
 @authorization.require_role("superuser")
-async def get_users(x_access_token: str = Header(None),
+async def get_users(request: Request,
+                    stream: bool = Query(False),
+                    x_access_token: str = Header(None),
                     auth_service: AuthenticationService = Depends(get_authentication_service),
                     users_service: UserService = Depends(get_users_service),
                     session: AsyncSession = Depends(get_session),
+                    read_session: AsyncSession = Depends(get_read_session),
+                    session_factory: async_sessionmaker = Depends(get_read_session_factory),
                     ):
     """
     Получает список всех пользователей
     Доступно только для пользователей с ролью "superuser"
+    Роль проверяется по основной базе данных, список читается из реплики
+    С заголовком "Accept: application/x-ndjson" или параметром stream=true возвращает пользователей
+    потоком (NDJSON или JSON-массив соответственно)
     """
     logger.info('')
-    return await users_service.get_users(session=session)
+    ndjson = wants_ndjson(request)
+    if ndjson or stream:
+        return stream_records(session_factory, users_service.stream_users, UserOut, ndjson=ndjson)
+
+    return FastJSONResponse(await users_service.get_users(session=read_session))
+
+
+@router.put("/{user_uuid}/role",
+            response_model=dict)
+@authorization.require_role("superuser")
+async def set_user_role(user_uuid: UUID,
+                        role: AccessLevel = Body(..., embed=True),
+                        x_access_token: str = Header(None),
+                        auth_service: AuthenticationService = Depends(get_authentication_service),
+                        users_service: UserService = Depends(get_users_service),
+                        session: AsyncSession = Depends(get_session),
+                        ):
+    """
+    Меняет роль пользователя
+    Доступно только для пользователей с ролью "superuser"
+    Версия роли увеличивается: токены доступа пользователя с прежней ролью перестают приниматься
+    """
+    role_version = await users_service.set_role(session, user_uuid, role)
+    auth_service.roles.invalidate(user_uuid)
+    return FastJSONResponse({"uuid": user_uuid, "role": role, "role_version": role_version})
+
+
+@router.get("/{name}/articles",
+            response_model=ArticlePage)
+async def get_user_articles(name: str,
+                            limit: int = Query(20, ge=1, le=100),
+                            cursor: str | None = Query(None),
+                            article_service: ArticleService = Depends(get_articles_service),
+                            session: AsyncSession = Depends(get_read_session),
+                            ):
+    """
+    Возвращает страницу статей пользователя, от новых к старым, с именем и ролью автора
+    Для получения следующей страницы передайте next_cursor из ответа в параметре cursor
+    """
+    return FastJSONResponse(
+        await article_service.get_author_articles(session, author_name=name, limit=limit, cursor=cursor)
+    )
 
 
 @router.get("/{name}")
@@ -33,23 +86,22 @@ async def get_user(name: str,
                    x_access_token: str = Header(None),
                    users_service: UserService = Depends(get_users_service),
                    auth_service: AuthenticationService = Depends(get_authentication_service),
-                   session: AsyncSession = Depends(get_session),
+                   session: AsyncSession = Depends(get_read_session),
                    ):
     """
     Получает информацию о пользователе по имени
     Если токен доступа предоставлен и совпадает с UUID пользователя, возвращается информация о владельце
     """
     user = await users_service.get_user(username=name, session=session)
-    user_data = jsonable_encoder(user)
     if x_access_token:
         token_uuid = await auth_service.verify_access_token(x_access_token)
         if token_uuid == user.uuid:
-            return JSONResponse(
-                content={"user": user_data, "is_owner": True},
+            return FastJSONResponse(
+                content={"user": user, "is_owner": True},
             )
 
-    return JSONResponse(
-        content={"user": user_data, "is_owner": False},
+    return FastJSONResponse(
+        content={"user": user, "is_owner": False},
     )
 
 
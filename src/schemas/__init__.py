@@ -2,12 +2,26 @@ __all__ = [
     "Article",
     "ArticleCreate",
     "ArticleUpdate",
+    "ArticlePage",
+    "ArticlePartial",
+    "ArticleField",
+    "ArticleBulkResult",
+    "ArticleBulkError",
+    "ArticleFilter",
+    "ArticleAuthor",
+    "ArticleWithAuthor",
+    "ArticleEmbed",
     "AccessLevel",
     "UserIn",
     "UserOut",
-    "UserAll"
+    "UserAll",
+    "UserStats",
+    "UserProfile",
 ]
 
 
-from .articles import Article, ArticleBase, ArticleCreate, ArticleUpdate
-from .users import AccessLevel, UserIn, UserOut, UserAll
+from .articles import (
+    Article, ArticleBase, ArticleCreate, ArticleUpdate, ArticlePage, ArticlePartial, ArticleField,
+    ArticleBulkResult, ArticleBulkError, ArticleFilter, ArticleAuthor, ArticleWithAuthor, ArticleEmbed,
+)
+from .users import AccessLevel, UserIn, UserOut, UserAll, UserStats, UserProfile
@@ -1,8 +1,11 @@
 from typing import Annotated
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 from uuid import UUID, uuid4
 from datetime import datetime
+from enum import Enum
+
+from .users import AccessLevel
 
 
 
@@ -24,7 +27,71 @@ class Article(ArticleBase):
     id: int
     created_at: Annotated[datetime, Field(default=datetime.now())]
     updated_at: datetime | None = None
+    version: Annotated[int, Field(default=1, ge=1)]
+
+
+class ArticleAuthor(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str
+    role: AccessLevel
+
+
+class ArticleWithAuthor(Article):
+    author: Annotated[ArticleAuthor | None, Field(validation_alias=AliasChoices("author", "user"))]
 
 
 class ArticleUpdate(Article):
     updated_at: datetime
+    version: Annotated[int, Field(ge=1)]
+
+
+class ArticleFilter(BaseModel):
+    author_id: UUID | None = None
+    min_rating: Annotated[float | None, Field(default=None, ge=0.0, le=5.0)]
+    max_rating: Annotated[float | None, Field(default=None, ge=0.0, le=5.0)]
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+
+
+class ArticleBulkError(BaseModel):
+    index: int
+    errors: list[dict]
+
+
+class ArticleBulkResult(BaseModel):
+    created: list[Article]
+    errors: list[ArticleBulkError]
+
+
+class ArticleField(str, Enum):
+    id = "id"
+    title = "title"
+    text = "text"
+    author_id = "author_id"
+    rating = "rating"
+    created_at = "created_at"
+    updated_at = "updated_at"
+    version = "version"
+
+
+class ArticleEmbed(str, Enum):
+    author = "author"
+
+
+class ArticlePartial(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str | None = None
+    text: str | None = None
+    author_id: UUID | None = None
+    rating: float | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    version: int | None = None
+
+
+class ArticlePage(BaseModel):
+    items: Annotated[list[ArticleWithAuthor] | list[Article] | list[ArticlePartial], Field(union_mode="left_to_right")]
+    next_cursor: str | None = None
@@ -1,7 +1,7 @@
 from typing import Annotated
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, computed_field, field_validator
 from uuid import uuid4, UUID
 from enum import Enum
 
@@ -44,3 +44,26 @@ class UserAll(UserBase):
     created_at: datetime
     deleted_at: datetime | None
 
+
+class UserStats(BaseModel):
+    model_config = ConfigDict(
+        from_attributes=True,
+    )
+
+    article_count: int = 0
+    rating_sum: Annotated[float, Field(default=0.0, exclude=True)]
+    last_published_at: datetime | None = None
+
+    @computed_field
+    @property
+    def average_rating(self) -> float | None:
+        return self.rating_sum / self.article_count if self.article_count else None
+
+
+class UserProfile(UserOut):
+    stats: UserStats = Field(default_factory=UserStats)
+
+    @field_validator("stats", mode="before")
+    @classmethod
+    def empty_stats(cls, value):
+        return UserStats() if value is None else value
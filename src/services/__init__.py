@@ -5,7 +5,15 @@ __all__ = [
     "AuthorizationService",
     "RegistrationService",
     "authorization",
-    "TokenService"
+    "TokenService",
+    "LRUCache",
+    "RenderedCache",
+    "RenderedResponse",
+    "SingleFlight",
+    "PasswordHasher",
+    "BloomFilter",
+    "RoleCache",
+    "JWTKeys",
 ]
 
 
@@ -23,3 +31,10 @@ from .article import (
 
 
 from .users import UserService
+from .cache import LRUCache
+from .rendered import RenderedCache, RenderedResponse
+from .singleflight import SingleFlight
+from .hashing import PasswordHasher
+from .bloom import BloomFilter
+from .roles import RoleCache
+from .keys import JWTKeys
@@ -1,34 +1,206 @@
-from sqlalchemy.ext.asyncio import AsyncSession
-from src.repositories import Article, ArticleRepository
-from src.schemas.articles import ArticleCreate, ArticleUpdate
+import asyncio
+from functools import partial
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.config import logger, settings
+from src.repositories import ArticleRepository
+from src.schemas.articles import (
+    Article, ArticleCreate, ArticleUpdate, ArticlePage, ArticleBulkResult, ArticleBulkError, ArticleFilter,
+)
+from .cache import LRUCache
+from .ranking import ArticleRanking
+from .rendered import RenderedCache
+from .singleflight import SingleFlight
 
 class ArticleService:
 
-    def __init__(self, repository: ArticleRepository):
+    def __init__(self, repository: ArticleRepository, cache: LRUCache | None = None,
+                 ranking: ArticleRanking | None = None, rendered: RenderedCache | None = None,
+                 inflight: SingleFlight | None = None):
         """
         Инициализация сервиса статей
 
         :param repository: Репозиторий для работы с данными статей
+        :param cache: Кэш статей по ID. По умолчанию создается по настройкам settings.cache
+        :param ranking: Ранжирование для лент лучших и трендовых статей. По умолчанию создается по настройкам settings.ranking
+        :param rendered: Кэш закодированных ответов по ID статьи и страницам списка. По умолчанию создается по настройкам settings.cache
+        :param inflight: Объединение одновременных чтений статьи по ID при промахе кэша
+
+        С репликами кэши по умолчанию не заполняются в течение окна read-your-writes после изменения статьи:
+        реплика может еще отдавать старую версию, и она осталась бы в кэше на все время его жизни
         """
         self.repository = repository
+        replica_lag = settings.db.read_your_writes_window if settings.db.replica_urls else 0.0
+        self.cache = cache if cache is not None else LRUCache(
+            maxsize=settings.cache.article_maxsize,
+            ttl=settings.cache.article_ttl,
+            hold=replica_lag,
+        )
+        self.ranking = ranking if ranking is not None else ArticleRanking(
+            ttl=settings.ranking.ttl,
+            trending_half_life=settings.ranking.trending_half_life,
+        )
+        self.rendered = rendered if rendered is not None else RenderedCache(
+            maxsize=settings.cache.rendered_maxsize,
+            ttl=settings.cache.article_ttl,
+            article_maxbytes=settings.cache.rendered_article_maxbytes,
+            page_maxbytes=settings.cache.rendered_page_maxbytes,
+            hold=replica_lag,
+        )
+        self.inflight = inflight if inflight is not None else SingleFlight()
 
     async def create_article(self, session: AsyncSession, article_in: ArticleCreate) -> Article:
         """Создает новую статью в базе данных"""
-        return await self.repository.create_article(session=session, article_in=article_in)
+        article = await self.repository.create_article(session=session, article_in=article_in)
+        self.ranking.add(article.id, article.rating, article.created_at)
+        self.rendered.invalidate_pages()
+        return article
+
+    async def create_articles(self, session: AsyncSession, articles_in: list[dict]) -> ArticleBulkResult:
+        """
+        Создает статьи пакетом
+
+        Каждая статья валидируется отдельно: невалидные попадают в список ошибок с индексом
+        во входном списке и не мешают созданию остальных. Авторы всех статей проверяются одним
+        запросом: статья с несуществующим автором тоже попадает в список ошибок, а не отменяет весь пакет
+        """
+        valid = []
+        errors = []
+        for index, data in enumerate(articles_in):
+            try:
+                valid.append((index, ArticleCreate.model_validate(data)))
+            except ValidationError as e:
+                errors.append(ArticleBulkError(index=index, errors=e.errors(include_url=False, include_context=False)))
+
+        if valid:
+            authors = await self.repository.find_existing_authors(session, {article.author_id for _, article in valid})
+            for index, article in valid:
+                if article.author_id not in authors:
+                    errors.append(ArticleBulkError(index=index, errors=[{
+                        "type": "author_not_found",
+                        "loc": ("author_id",),
+                        "msg": "Author not found",
+                        "input": str(article.author_id),
+                    }]))
+            valid = [article for _, article in valid if article.author_id in authors]
+            errors.sort(key=lambda error: error.index)
+
+        created = await self.repository.create_articles(session=session, articles_in=valid) if valid else []
+        for article in created:
+            self.ranking.add(article.id, article.rating, article.created_at)
+        if created:
+            self.rendered.invalidate_pages()
+        return ArticleBulkResult(created=created, errors=errors)
+
+    async def get_articles(self, session: AsyncSession, limit: int = 20, cursor: str | None = None,
+                           fields: list[str] | None = None, filters: ArticleFilter | None = None,
+                           embed_author: bool = False) -> ArticlePage:
+        """Получает страницу статей, подходящих под фильтры, начиная с позиции курсора, только с указанными полями"""
+        return await self.repository.get_articles(session, limit=limit, cursor=cursor, fields=fields, filters=filters,
+                                                  embed_author=embed_author)
+
+    async def get_author_articles(self, session: AsyncSession, author_name: str, limit: int = 20,
+                                  cursor: str | None = None) -> ArticlePage:
+        """Получает страницу статей автора по его имени вместе с данными автора"""
+        return await self.repository.get_author_articles(session, author_name=author_name, limit=limit, cursor=cursor)
+
+    async def search_articles(self, session: AsyncSession, query: str, limit: int = 20,
+                              cursor: str | None = None) -> ArticlePage:
+        """Ищет статьи по заголовку и тексту, самые релевантные первыми"""
+        return await self.repository.search_articles(session, query=query, limit=limit, cursor=cursor)
+
+    async def stream_articles(self, session: AsyncSession, filters: ArticleFilter | None = None) -> AsyncIterator[list[Article]]:
+        """Потоково получает все статьи, подходящие под фильтры, порциями"""
+        async for chunk in self.repository.stream_articles(session, filters=filters):
+            yield chunk
+
+    async def refresh_ranking(self, session: AsyncSession, force: bool = True) -> None:
+        """
+        Перечитывает ранжирование из базы данных
+
+        Создание, изменение и удаление статей во время чтения не теряются: ранжирование применяет их
+        к перечитанным данным
 
+        :param force: Перечитать, даже если ранжирование уже загружено
+        """
+        async with self.ranking.lock:
+            if not force and self.ranking.loaded:
+                return
+
+            self.ranking.begin_load()
+            try:
+                rows = await self.repository.get_ranking_keys(session)
+            except BaseException:
+                self.ranking.cancel_load()
+                raise
+            self.ranking.load(rows)
+
+    async def refresh_ranking_periodically(self, session_factory: async_sessionmaker) -> None:
+        """Фоновая задача: перечитывает ранжирование раз в ranking.ttl секунд, пока ее не отменят"""
+        while True:
+            await asyncio.sleep(self.ranking.ttl)
+            try:
+                async with session_factory() as session:
+                    await self.refresh_ranking(session)
+            except Exception as e:
+                logger.warning(f"Ranking refresh failed: {e!r}")
+
+    async def _ensure_ranking(self, session: AsyncSession) -> None:
+        """Загружает ранжирование при первом обращении, если его не загрузили при запуске приложения"""
+        if not self.ranking.loaded:
+            await self.refresh_ranking(session, force=False)
 
-    async def get_articles(self, session: AsyncSession) -> list[Article]:
-        """Получает список всех статей"""
-        result = await self.repository.get_articles(session)
-        return list(result)
+    async def get_top_articles(self, session: AsyncSession, limit: int = 10) -> list[Article]:
+        """Получает статьи с наибольшим рейтингом"""
+        await self._ensure_ranking(session)
+        return await self.repository.get_articles_by_ids(session, self.ranking.top(limit))
+
+    async def get_trending_articles(self, session: AsyncSession, limit: int = 10) -> list[Article]:
+        """Получает статьи с наибольшим рейтингом с учетом их свежести"""
+        await self._ensure_ranking(session)
+        return await self.repository.get_articles_by_ids(session, self.ranking.trending(limit))
 
     async def get_article_by_id(self, session: AsyncSession, article_id: int) -> Article | None:
-        """Получает статью по ее ID"""
-        return await self.repository.get_article_by_id(session=session, article_id=article_id)
+        """
+        Получает статью по ее ID, сначала из кэша, при промахе - из базы данных
+
+        Одновременные промахи по одной статье выполняют один запрос к базе данных
+        и получают его результат все вместе. Поколение ключа входит в ключ объединения:
+        чтение после изменения статьи не присоединяется к запросу, начатому до изменения
+        """
+        article = self.cache.get(article_id)
+        if article is not None:
+            return article
+
+        generation = self.cache.generation(article_id)
+        return await self.inflight.do(
+            (article_id, generation),
+            partial(self._load_article, session, article_id, generation),
+        )
+
+    async def _load_article(self, session: AsyncSession, article_id: int, generation: tuple[int, int]) -> Article | None:
+        """
+        Читает статью из базы данных и сохраняет ее в кэше
+
+        Если статью изменили или удалили, пока шло чтение, прочитанная версия в кэш не попадает
+
+        :param generation: Поколение ключа в кэше, взятое до чтения
+        """
+        article = await self.repository.get_article_by_id(session=session, article_id=article_id)
+        if article is not None:
+            article = Article.model_validate(article)
+            self.cache.set(article_id, article, generation=generation)
+
+        return article
 
     async def update_article(self, session: AsyncSession, article_update: ArticleUpdate, article_id: int) -> Article:
         """Обновляет статью по её ID"""
         result = await self.repository.update_article(session=session, article_update=article_update, article_id=article_id)
+        self.cache.invalidate(article_id)
+        self.rendered.invalidate_article(article_id)
+        self.ranking.add(result.id, result.rating, result.created_at)
         return result
 
     async def delete_article(self, session: AsyncSession, article_id: int) -> None:
@@ -36,4 +208,7 @@ class ArticleService:
         Удаляет статью по её ID
         """
         await self.repository.delete_article(session=session, article_id=article_id)
+        self.cache.invalidate(article_id)
+        self.rendered.invalidate_article(article_id)
+        self.ranking.remove(article_id)
 
@@ -1,4 +1,6 @@
+import hashlib
 from datetime import datetime, timedelta
+from time import time
 from dotenv import load_dotenv
 from functools import wraps
 from passlib.context import CryptContext
@@ -6,11 +8,17 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt import decode as jwt_decode, encode as jwt_encode, ExpiredSignatureError, PyJWTError
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.config import auth_jwt
-from src.repositories import Refresh, AuthenticationRepository, User
-from src.schemas import UserIn, UserOut
+from src.config import auth_jwt, settings
+from src.repositories import Refresh, AuthenticationRepository, User, UserRepository
+from src.schemas import AccessLevel, UserIn, UserOut
 from uuid import UUID
 
+from .bloom import BloomFilter
+from .cache import LRUCache
+from .hashing import PasswordHasher
+from .keys import JWTKeys
+from .roles import RoleCache, has_role
+
 load_dotenv()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/")
@@ -20,10 +28,24 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 class TokenService:
     """
     Сервис для работы с JWT токенами.
+
+    Проверенные токены кэшируются по SHA-256 от токена: повторная проверка того же токена
+    не проверяет подпись заново. Запись живет не дольше срока действия токена (exp).
+    Ключи RS*, PS*, ES* и EdDSA разбираются из PEM один раз и хранятся в keys.
     """
 
-    @staticmethod
-    async def create_token(data: dict, expires: datetime) -> str:
+    def __init__(self, cache: LRUCache | None = None, keys: JWTKeys | None = None):
+        """
+        :param cache: Кэш проверенных токенов. По умолчанию создается по настройкам TOKEN_CACHE_SIZE и TOKEN_CACHE_TTL
+        :param keys: Разобранные ключи подписи и проверки. По умолчанию берутся из настроек auth_jwt
+        """
+        self.cache = cache if cache is not None else LRUCache(
+            maxsize=int(auth_jwt.TOKEN_CACHE_SIZE),
+            ttl=float(auth_jwt.TOKEN_CACHE_TTL),
+        )
+        self.keys = keys if keys is not None else JWTKeys(auth_jwt)
+
+    async def create_token(self, data: dict, expires: datetime) -> str:
         """
         Создает JWT токен с заданными данными и временем истечения срока.
 
@@ -45,8 +67,8 @@ class TokenService:
 
             return jwt_encode(
                 to_encode,
-                auth_jwt.PRIVATE_JWT,
-                algorithm=auth_jwt.ALGORITHM,
+                self.keys.signing_key(),
+                algorithm=self.keys.algorithm,
             )
         except PyJWTError as e:
             raise HTTPException(
@@ -54,21 +76,27 @@ class TokenService:
                 detail="Token access creating error",
             )
 
-    @staticmethod
-    async def decode_token(token: str, verify_exp: bool = True) -> dict:
+    async def decode_token(self, token: str, verify_exp: bool = True) -> dict:
         """
         Декодирует JWT токен и возвращает данные.
+        Токены со сроком действия берутся из кэша проверенных токенов, если они там есть.
 
         :param token: JWT токен для декодирования.
         :param verify_exp: Проверять ли срок действия токена.
         :return: Декодированные данные из токена.
         :raises HTTPException: Если токен истек или невалиден.
         """
+        key = hashlib.sha256(token.encode()).digest() if verify_exp else None
+        if key is not None:
+            payload = self.cache.get(key)
+            if payload is not None:
+                return dict(payload)
+
         try:
-            return jwt_decode(
+            payload = jwt_decode(
                 token,
-                auth_jwt.PUBLIC_JWT,
-                algorithms=[auth_jwt.ALGORITHM],
+                self.keys.verification_key(),
+                algorithms=[self.keys.algorithm],
                 options={"verify_exp": verify_exp},
             )
         except ExpiredSignatureError:
@@ -84,39 +112,127 @@ class TokenService:
                 headers={"WWW-Authenticate": "Bearer"},
             ) from e
 
+        if key is not None and isinstance(payload.get("exp"), (int, float)):
+            ttl = min(self.cache.ttl, payload["exp"] - time())
+            if ttl > 0:
+                self.cache.set(key, dict(payload), ttl=ttl)
+
+        return payload
+
 
 class BaseAuthService:
     """
     Базовый сервис для аутентификации, включающий операции с паролями.
     """
 
-    def __init__(self, repository: AuthenticationRepository):
+    def __init__(self, repository: AuthenticationRepository, hasher: PasswordHasher | None = None):
         """
         Инициализация базового сервиса аутентификации.
 
         :param repository: Репозиторий для работы с данными пользователей.
+        :param hasher: Пул для хэширования паролей. По умолчанию создается по настройкам settings.hashing
         """
         self.repository = repository
+        self.hasher = hasher if hasher is not None else PasswordHasher(
+            pwd_context,
+            workers=settings.hashing.workers,
+            max_queue=settings.hashing.max_queue,
+            retry_after=settings.hashing.retry_after,
+        )
 
     async def get_password_hash(self, password: str) -> str:
-        """ Генерирует хэш пароля"""
-        return pwd_context.hash(password)
+        """ Генерирует хэш пароля в пуле потоков, не блокируя цикл событий"""
+        return await self.hasher.hash(password)
 
     async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """ Проверяет, совпадает ли введенный пароль с хэшированным"""
-        return pwd_context.verify(plain_password, hashed_password)
+        """ Проверяет, совпадает ли введенный пароль с хэшированным, в пуле потоков"""
+        return await self.hasher.verify(plain_password, hashed_password)
 
 
 class RegistrationService(BaseAuthService):
     """
     Сервис для регистрации пользователей.
+
+    Занятые имя и адрес электронной почты отсеиваются до хэширования пароля. Фильтр Блума по
+    существующим пользователям отвечает без обращения к базе данных, что значения свободны;
+    если фильтр считает значение занятым, это проверяется запросом по уникальному индексу.
+    Пока фильтр не заполнен через warm_up, предварительная проверка не выполняется и дубликаты
+    отклоняет уникальное ограничение при вставке. Регистрации в других процессах фильтр не видит:
+    такой дубликат тоже отклоняется ограничением, но уже после хэширования.
     """
 
+    def __init__(self, repository: AuthenticationRepository, hasher: PasswordHasher | None = None,
+                 user_repository: UserRepository | None = None, known_users: BloomFilter | None = None):
+        """
+        Инициализация сервиса регистрации.
+
+        :param repository: Репозиторий для работы с данными пользователей.
+        :param hasher: Пул для хэширования паролей.
+        :param user_repository: Репозиторий для проверки занятости имени и адреса электронной почты.
+        :param known_users: Фильтр Блума по именам и адресам электронной почты. По умолчанию создается по настройкам settings.registration
+        """
+        super().__init__(repository, hasher)
+        self.user_repository = user_repository if user_repository is not None else UserRepository()
+        self.known_users = known_users if known_users is not None else BloomFilter(
+            capacity=settings.registration.bloom_capacity,
+            error_rate=settings.registration.bloom_error_rate,
+        )
+        self.warmed = False
+        self.rejected = 0
+
+    def _remember(self, name: str, email: str) -> None:
+        self.known_users.add(f"name:{name}")
+        self.known_users.add(f"email:{email}")
+
+    async def warm_up(self, session: AsyncSession) -> None:
+        """Заполняет фильтр Блума именами и адресами электронной почты существующих пользователей"""
+        async for chunk in self.user_repository.stream_identities(session):
+            for name, email in chunk:
+                self._remember(name, email)
+        self.warmed = True
+
+    async def ensure_unique(self, user_in: UserIn, session: AsyncSession) -> None:
+        """
+        Проверяет, что имя и адрес электронной почты свободны.
+
+        :raises HTTPException: 409, если имя или адрес электронной почты уже заняты.
+        """
+        if not self.warmed:
+            return
+
+        name = user_in.name
+        email = str(user_in.email)
+        maybe_name = f"name:{name}" in self.known_users
+        maybe_email = f"email:{email}" in self.known_users
+        if not (maybe_name or maybe_email):
+            return
+
+        name_taken, email_taken = await self.user_repository.find_taken(
+            session, name=name if maybe_name else None, email=email if maybe_email else None,
+        )
+        if name_taken:
+            self.rejected += 1
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User with the name already exists")
+        if email_taken:
+            self.rejected += 1
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User with the email already exists")
+
     async def create_new_user(self, user_in: UserIn, session: AsyncSession) -> UserOut:
-        """Регистрирует нового пользователя в системе"""
+        """Регистрирует нового пользователя в системе, отклоняя занятые имя и адрес электронной почты до хэширования пароля"""
+        await self.ensure_unique(user_in, session)
         user_in.password = await self.get_password_hash(user_in.password)
         new_user = User(**user_in.model_dump(by_alias=True))
-        return await self.repository.create_new_user(new_user, session)
+        user = await self.repository.create_new_user(new_user, session)
+        self._remember(user_in.name, str(user_in.email))
+        return user
+
+    def stats(self) -> dict:
+        """Возвращает показатели фильтра Блума и количество отклоненных до хэширования регистраций"""
+        return {
+            "warmed": self.warmed,
+            "rejected_before_hashing": self.rejected,
+            "bloom": self.known_users.stats(),
+        }
 
 
 class AuthenticationService(BaseAuthService):
@@ -124,9 +240,15 @@ class AuthenticationService(BaseAuthService):
     Сервис для аутентификации пользователей и работы с токенами.
     """
 
-    def __init__(self, repository: AuthenticationRepository):
-        super().__init__(repository)
-        self.token_service = TokenService()
+    def __init__(self, repository: AuthenticationRepository, hasher: PasswordHasher | None = None,
+                 roles: RoleCache | None = None, token_service: TokenService | None = None):
+        super().__init__(repository, hasher)
+        self.token_service = token_service if token_service is not None else TokenService()
+        self.roles = roles if roles is not None else RoleCache(
+            UserRepository(),
+            maxsize=int(auth_jwt.ROLE_CACHE_SIZE),
+            ttl=float(auth_jwt.ROLE_CACHE_TTL),
+        )
 
     async def verify_user(self, user_data, session: AsyncSession) -> UserOut:
         """
@@ -144,30 +266,46 @@ class AuthenticationService(BaseAuthService):
 
         return UserOut.model_validate(user)
 
-    async def create_access_token(self, data: dict) -> str:
+    async def create_access_token(self, data: dict, session: AsyncSession | None = None) -> str:
         """
          Создает новый токен доступа (JWT).
+         Если передана сессия, в токен добавляются текущие роль (role) и версия роли (rv) пользователя:
+         по ним require_role проверяет права без запроса к базе данных.
         """
+        if session is not None:
+            current = await self.roles.repository.get_role(session, UUID(str(data["sub"])))
+            if current is not None:
+                role, role_version = current
+                self.roles.remember(UUID(str(data["sub"])), role, role_version)
+                data = {**data, "role": AccessLevel(role).value, "rv": role_version}
 
         expires = datetime.now() + timedelta(minutes=int(auth_jwt.ACCESS_TIMEDELTA))
         encoded_jwt = await self.token_service.create_token(data=data, expires=expires)
         return encoded_jwt
 
-    async def verify_access_token(self, access_token: str = Depends(oauth2_scheme)) -> UUID:
+    async def decode_access_token(self, access_token: str) -> dict:
         """
-        Проверяет и декодирует токен доступа, возвращая UUID пользователя.
+        Проверяет подпись и срок действия токена доступа и возвращает его данные.
+
+        :raises HTTPException: 401, если токен невалиден, истек или не содержит UUID пользователя.
         """
         payload = await self.token_service.decode_token(access_token)
-        user_uuid = payload.get("sub")
 
-        if user_uuid is None:
+        if payload.get("sub") is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        return UUID(user_uuid)
+        return payload
+
+    async def verify_access_token(self, access_token: str = Depends(oauth2_scheme)) -> UUID:
+        """
+        Проверяет и декодирует токен доступа, возвращая UUID пользователя.
+        """
+        payload = await self.decode_access_token(access_token)
+        return UUID(payload["sub"])
 
     async def save_refresh_token(self, token: Refresh, session: AsyncSession) -> None:
         """Сохраняет refresh токен в базе данных"""
@@ -206,7 +344,7 @@ class AuthenticationService(BaseAuthService):
         except PyJWTError:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-        return await self.create_access_token(data={"sub": user_uuid})
+        return await self.create_access_token(data={"sub": user_uuid}, session=session)
 
 
 class AuthorizationService:
@@ -218,6 +356,13 @@ class AuthorizationService:
         """
         Декоратор для проверки роли пользователя перед выполнением функции.
 
+        Роль берется из проверенного токена доступа (claims role и rv). Если включен кэш ролей,
+        версия роли в токене сверяется с текущей из кэша, который обращается к базе данных
+        не чаще раза в ROLE_CACHE_TTL секунд на пользователя. Любая смена роли увеличивает
+        версию роли (триггер users_role_version), поэтому токен с прежней ролью перестает
+        приниматься не позже чем через ROLE_CACHE_TTL секунд. Для токенов без role и rv,
+        выданных до их появления, роль читается через тот же кэш.
+
         :param role: Требуемая роль для доступа (например, "user", "admin", "superuser").
         :return: Функция с дополнительной логикой авторизации.
         """
@@ -226,22 +371,29 @@ class AuthorizationService:
             async def inner(**kwargs):
 
                 auth_service: AuthenticationService = kwargs['auth_service']
-                auth_repository = AuthenticationRepository()
                 x_access_token = kwargs['x_access_token']
                 session: AsyncSession = kwargs['session']
 
-                uuid = await auth_service.verify_access_token(x_access_token)
-                user = await auth_repository.get_user_data(session=session, user_uuid=uuid)
-                user_role = user.role.value
-
-                if role == "user" and user_role not in ['user', 'admin', 'superuser']:
-                    raise HTTPException(status_code=401, detail="Unauthorized")
-
-                if role == 'admin' and user_role not in ['admin', 'superuser']:
-                    raise HTTPException(status_code=401, detail="not enough rights")
-
-                if role == 'superuser' and user_role not in ['superuser']:
-                    raise HTTPException(status_code=401, detail="not enough rights")
+                payload = await auth_service.decode_access_token(x_access_token)
+                uuid = UUID(payload["sub"])
+                user_role = payload.get("role")
+                role_version = payload.get("rv")
+
+                if user_role is None or role_version is None or auth_service.roles.enabled:
+                    current = await auth_service.roles.current(session, uuid)
+                    if current is None:
+                        raise HTTPException(status_code=401, detail="Unauthorized")
+
+                    current_role, current_version = current
+                    if user_role is None or role_version is None:
+                        user_role = AccessLevel(current_role).value
+                    elif role_version != current_version:
+                        raise HTTPException(status_code=401, detail="Token role is outdated",
+                                            headers={"WWW-Authenticate": "Bearer"})
+
+                if not has_role(user_role, role):
+                    raise HTTPException(status_code=401,
+                                        detail="Unauthorized" if role == "user" else "not enough rights")
 
                 return await func(**kwargs)
 
@@ -0,0 +1,58 @@
+import hashlib
+from math import ceil, log
+
+
+class BloomFilter:
+    """
+    Фильтр Блума: компактное множество, которое может ошибиться только в одну сторону.
+
+    Если значения нет в фильтре, его точно не добавляли. Если есть - его, скорее всего, добавляли,
+    и это нужно подтвердить запросом к базе данных. Доля ложных срабатываний не превышает
+    error_rate, пока количество значений не больше capacity, и плавно растет после.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        :param capacity: Ожидаемое количество значений.
+        :param error_rate: Допустимая доля ложных срабатываний при capacity значений.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, ceil(-capacity * log(error_rate) / log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, value: str) -> None:
+        """Добавляет значение в фильтр"""
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    def clear(self) -> None:
+        """Удаляет все значения"""
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+    def stats(self) -> dict:
+        """Возвращает размер фильтра и количество добавленных значений"""
+        return {
+            "count": self.count,
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "bits": self.size,
+            "hash_count": self.hash_count,
+        }
@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Hashable
+
+
+class LRUCache:
+    """
+    Ограниченный по количеству записей LRU-кэш с временем жизни записей.
+    Может дополнительно ограничивать суммарный размер записей в байтах.
+    Ведет счетчики попаданий, промахов и вытеснений.
+
+    Для каждого ключа хранится поколение, которое растет при invalidate и clear. Значение,
+    прочитанное до инвалидации, не сохраняется, если передать в set поколение, взятое до чтения.
+    С hold ключ после invalidate не заполняется еще hold секунд, пока реплики могут отдавать старые данные.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, maxbytes: int = 0,
+                 sizeof: Callable[[Any], int] = len, hold: float = 0.0):
+        """
+        Инициализация кэша.
+
+        :param maxsize: Максимальное количество записей. 0 отключает кэш.
+        :param ttl: Время жизни записи в секундах.
+        :param maxbytes: Максимальный суммарный размер записей в байтах. 0 - без ограничения.
+        :param sizeof: Функция, возвращающая размер значения в байтах. Используется только вместе с maxbytes.
+        :param hold: Сколько секунд после invalidate не сохранять значение по ключу. 0 - сохранять сразу.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.hold = hold
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._sizes: dict[Hashable, int] = {}
+        self._generations: dict[Hashable, int] = {}
+        self._epoch = 0
+        self._held: dict[Hashable, float] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Возвращает значение по ключу или default, если записи нет или она устарела"""
+        entry = self._data.get(key)
+
+        if entry is None or entry[0] <= monotonic():
+            if entry is not None:
+                self._pop(key)
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def generation(self, key: Hashable) -> tuple[int, int]:
+        """Возвращает поколение ключа: его нужно взять до чтения значения из источника"""
+        return self._epoch, self._generations.get(key, 0)
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None,
+            generation: tuple[int, int] | None = None) -> None:
+        """
+        Сохраняет значение, вытесняя самые давно использованные записи при переполнении
+
+        :param ttl: Время жизни этой записи в секундах, если оно должно отличаться от ttl кэша.
+        :param generation: Поколение ключа до чтения значения. Если ключ с тех пор инвалидирован, значение не сохраняется.
+        """
+        if self.maxsize <= 0:
+            return
+        if generation is not None and generation != self.generation(key):
+            return
+        if self._held and self._held.get(key, 0.0) > monotonic():
+            return
+
+        size = 0
+        if self.maxbytes:
+            size = self.sizeof(value)
+            if size > self.maxbytes:
+                self._pop(key)
+                return
+
+        self._pop(key)
+        self._data[key] = (monotonic() + (self.ttl if ttl is None else ttl), value)
+        if size:
+            self._sizes[key] = size
+            self.bytes += size
+
+        while len(self._data) > self.maxsize or (self.maxbytes and self.bytes > self.maxbytes):
+            self._pop(next(iter(self._data)))
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Удаляет запись по ключу, если она есть, и увеличивает поколение ключа"""
+        self._pop(key)
+        if key not in self._generations and len(self._generations) >= max(self.maxsize, 1):
+            # Поколения не должны расти без ограничений: сброс эпохи инвалидирует все ключи сразу
+            self._generations.clear()
+            self._epoch += 1
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+        if self.hold > 0:
+            now = monotonic()
+            if len(self._held) >= max(self.maxsize, 1):
+                self._held = {held_key: until for held_key, until in self._held.items() if until > now}
+            self._held[key] = now + self.hold
+
+    def clear(self) -> None:
+        """Удаляет все записи и инвалидирует все ключи"""
+        self._data.clear()
+        self._sizes.clear()
+        self._generations.clear()
+        self._epoch += 1
+        self.bytes = 0
+
+    def _pop(self, key: Hashable) -> None:
+        """Удаляет запись и учитывает освободившийся размер"""
+        self._data.pop(key, None)
+        self.bytes -= self._sizes.pop(key, 0)
+
+    def stats(self) -> dict:
+        """Возвращает текущий размер кэша и значения счетчиков"""
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "maxbytes": self.maxbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / requests if requests else 0.0,
+        }
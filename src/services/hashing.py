@@ -0,0 +1,118 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from time import perf_counter
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+
+class PasswordHasher:
+    """
+    Хэширование и проверка паролей bcrypt в отдельном пуле потоков.
+
+    bcrypt отпускает GIL на время вычисления хэша, поэтому потоки считают хэши параллельно
+    и не блокируют цикл событий. Очередь ожидающих задач ограничена: при ее заполнении
+    запрос сразу получает 503 с заголовком Retry-After, а не ждет вместе со всеми.
+    """
+
+    def __init__(self, context: CryptContext, workers: int = 4, max_queue: int = 64, retry_after: int = 1):
+        """
+        :param context: Контекст passlib, который хэширует и проверяет пароли.
+        :param workers: Количество потоков пула.
+        :param max_queue: Сколько задач может ждать свободный поток сверх выполняющихся.
+        :param retry_after: Минимальное значение заголовка Retry-After в секундах.
+        """
+        self.context = context
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+        self.in_flight = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_time = 0.0
+        self.max_hash_time = 0.0
+        self.wait_time = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Количество задач, ожидающих свободный поток"""
+        return self.in_flight - self.running
+
+    async def hash(self, password: str) -> str:
+        """Генерирует хэш пароля"""
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Проверяет, совпадает ли введенный пароль с хэшированным"""
+        return await self._run(self.context.verify, plain_password, hashed_password)
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Выполняет fn в пуле потоков.
+
+        :raises HTTPException: 503, если очередь пула заполнена.
+        """
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password operations, try again later",
+                headers={"Retry-After": str(self._estimate_retry_after())},
+            )
+
+        loop = asyncio.get_running_loop()
+        submitted = perf_counter()
+        self.in_flight += 1
+        future = self._executor.submit(self._timed, loop, submitted, fn, *args)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._finished))
+        return await asyncio.wrap_future(future)
+
+    def _timed(self, loop: asyncio.AbstractEventLoop, submitted: float, fn: Callable[..., Any], *args) -> Any:
+        """Выполняется в потоке пула и передает время ожидания и выполнения в цикл событий"""
+        started = perf_counter()
+        loop.call_soon_threadsafe(self._started, started - submitted)
+        try:
+            return fn(*args)
+        finally:
+            loop.call_soon_threadsafe(self._measured, perf_counter() - started)
+
+    def _started(self, waited: float) -> None:
+        self.running += 1
+        self.wait_time += waited
+
+    def _measured(self, elapsed: float) -> None:
+        self.running -= 1
+        self.completed += 1
+        self.hash_time += elapsed
+        self.max_hash_time = max(self.max_hash_time, elapsed)
+
+    def _finished(self) -> None:
+        self.in_flight -= 1
+
+    def _estimate_retry_after(self) -> int:
+        """Оценивает, через сколько секунд очередь разойдется, по среднему времени хэширования"""
+        average = self.hash_time / self.completed if self.completed else 0.0
+        return max(self.retry_after, ceil(self.in_flight * average / self.workers))
+
+    def shutdown(self) -> None:
+        """Останавливает пул потоков, дождавшись выполняющихся задач"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        """Возвращает глубину очереди и показатели времени хэширования"""
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "hash_time_avg_ms": self.hash_time / self.completed * 1000 if self.completed else 0.0,
+            "hash_time_max_ms": self.max_hash_time * 1000,
+            "wait_time_avg_ms": self.wait_time / self.completed * 1000 if self.completed else 0.0,
+        }
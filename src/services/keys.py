@@ -0,0 +1,79 @@
+from typing import Any
+
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from jwt import InvalidKeyError
+
+from src.config import AuthJWT, auth_jwt
+
+# Алгоритмы с парой ключей в PEM. Для HS* ключ - общий секрет, и разбирать его не нужно
+ASYMMETRIC_PREFIXES = ("RS", "PS", "ES", "EdDSA")
+
+
+def is_asymmetric(algorithm: str) -> bool:
+    """Проверяет, что алгоритм подписывает закрытым ключом и проверяет открытым"""
+    return (algorithm or "").startswith(ASYMMETRIC_PREFIXES)
+
+
+class JWTKeys:
+    """
+    Ключи подписи и проверки JWT, разобранные из PEM в объекты cryptography один раз.
+
+    PyJWT разбирает PEM-строку при каждом вызове encode/decode, а для RSA это дороже самой подписи.
+    Ключ разбирается при первом обращении и переиспользуется, пока не изменятся
+    алгоритм или PEM в настройках. Для HS* возвращается секрет как есть.
+    """
+
+    def __init__(self, config: AuthJWT = auth_jwt):
+        """
+        :param config: Настройки с алгоритмом и ключами PRIVATE_JWT и PUBLIC_JWT.
+        """
+        self.config = config
+        self._keys: dict[str, tuple[tuple[str, str], Any]] = {}
+        self.loads = 0
+
+    @property
+    def algorithm(self) -> str:
+        return self.config.ALGORITHM
+
+    def signing_key(self) -> Any:
+        """
+        Возвращает ключ для подписи токенов.
+
+        :raises InvalidKeyError: Если PRIVATE_JWT не удалось разобрать.
+        """
+        return self._load("private", self.config.PRIVATE_JWT, lambda pem: load_pem_private_key(pem, password=None))
+
+    def verification_key(self) -> Any:
+        """
+        Возвращает ключ для проверки подписи токенов.
+
+        :raises InvalidKeyError: Если PUBLIC_JWT не удалось разобрать.
+        """
+        return self._load("public", self.config.PUBLIC_JWT, load_pem_public_key)
+
+    def load(self) -> None:
+        """Разбирает оба ключа заранее, например, при запуске приложения, чтобы ошибка в ключах была видна сразу"""
+        self.signing_key()
+        self.verification_key()
+
+    def _load(self, kind: str, pem: str, loader) -> Any:
+        algorithm = self.algorithm
+        if not is_asymmetric(algorithm):
+            return pem
+
+        source = (algorithm, pem)
+        cached = self._keys.get(kind)
+        if cached is not None and cached[0] == source:
+            return cached[1]
+
+        try:
+            key = loader(pem.encode())
+        except (ValueError, TypeError, AttributeError) as e:
+            raise InvalidKeyError(f"Could not parse the {kind} key for {algorithm}") from e
+
+        self._keys[kind] = (source, key)
+        self.loads += 1
+        return key
+
+    def stats(self) -> dict:
+        return {"algorithm": self.algorithm, "parsed": is_asymmetric(self.algorithm), "loads": self.loads}
@@ -0,0 +1,119 @@
+import asyncio
+import math
+from bisect import bisect_left, insort
+from datetime import datetime
+from time import monotonic
+
+
+class ArticleRanking:
+    """
+    Отсортированные в памяти ключи статей для лент "лучшие" и "в тренде".
+
+    Ключи хранятся в отсортированных списках и обновляются точечно при создании, изменении
+    и удалении статей, поэтому чтение первых k статей стоит O(k). Ранжирование загружается
+    при запуске приложения и раз в ttl секунд перечитывается фоновой задачей, чтобы подхватить
+    изменения других процессов. Изменения между begin_load и load запоминаются и применяются
+    к перечитанным данным: снимок базы данных мог их еще не содержать.
+
+    Оценка "в тренде" - рейтинг, экспоненциально затухающий с возрастом статьи:
+    (rating + 1) * 2 ** (-(now - created_at) / half_life). Множитель с now одинаков для всех
+    статей, поэтому порядок задается ключом log(rating + 1) + created_at * ln2 / half_life,
+    который не зависит от текущего времени и не требует пересчета.
+    """
+
+    def __init__(self, ttl: float = 300.0, trending_half_life: float = 86400.0):
+        """
+        Инициализация ранжирования.
+
+        :param ttl: Как часто в секундах фоновая задача перечитывает ранжирование из базы данных.
+        :param trending_half_life: Время в секундах, за которое вклад статьи в тренд падает вдвое.
+        """
+        self.ttl = ttl
+        self.decay = math.log(2) / trending_half_life
+        self.lock = asyncio.Lock()
+        self._top: list[tuple[float, int]] = []
+        self._trending: list[tuple[float, int]] = []
+        self._keys: dict[int, tuple[tuple[float, int], tuple[float, int]]] = {}
+        self._loaded_at: float | None = None
+        self._pending: list[tuple[int, float | None, datetime | None]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def loaded(self) -> bool:
+        """Загружено ли ранжирование хотя бы раз"""
+        return self._loaded_at is not None
+
+    @property
+    def expired(self) -> bool:
+        """Нужно ли перечитать ранжирование из базы данных"""
+        return self._loaded_at is None or monotonic() - self._loaded_at > self.ttl
+
+    def _make_keys(self, article_id: int, rating: float, created_at: datetime) -> tuple[tuple, tuple]:
+        top_key = (-rating, -article_id)
+        trending_key = (-(math.log1p(rating) + created_at.timestamp() * self.decay), -article_id)
+        return top_key, trending_key
+
+    def begin_load(self) -> None:
+        """Начинает перечитывание: изменения до вызова load будут применены и к новым данным"""
+        self._pending = []
+
+    def cancel_load(self) -> None:
+        """Отменяет перечитывание, например, после ошибки чтения из базы данных"""
+        self._pending = None
+
+    def load(self, articles) -> None:
+        """
+        Заменяет ранжирование целиком и применяет изменения, сделанные после begin_load.
+
+        :param articles: Объекты с атрибутами id, rating и created_at.
+        """
+        pending, self._pending = self._pending or [], None
+        self._keys = {
+            article.id: self._make_keys(article.id, article.rating, article.created_at)
+            for article in articles
+        }
+        self._top = sorted(keys[0] for keys in self._keys.values())
+        self._trending = sorted(keys[1] for keys in self._keys.values())
+        for article_id, rating, created_at in pending:
+            if rating is None:
+                self._remove(article_id)
+            else:
+                self._add(article_id, rating, created_at)
+        self._loaded_at = monotonic()
+
+    def add(self, article_id: int, rating: float, created_at: datetime) -> None:
+        """Добавляет статью или обновляет её позицию"""
+        if self._pending is not None:
+            self._pending.append((article_id, rating, created_at))
+        self._add(article_id, rating, created_at)
+
+    def remove(self, article_id: int) -> None:
+        """Удаляет статью из ранжирования, если она там есть"""
+        if self._pending is not None:
+            self._pending.append((article_id, None, None))
+        self._remove(article_id)
+
+    def _add(self, article_id: int, rating: float, created_at: datetime) -> None:
+        self._remove(article_id)
+        top_key, trending_key = self._make_keys(article_id, rating, created_at)
+        insort(self._top, top_key)
+        insort(self._trending, trending_key)
+        self._keys[article_id] = (top_key, trending_key)
+
+    def _remove(self, article_id: int) -> None:
+        keys = self._keys.pop(article_id, None)
+        if keys is None:
+            return
+
+        del self._top[bisect_left(self._top, keys[0])]
+        del self._trending[bisect_left(self._trending, keys[1])]
+
+    def top(self, limit: int) -> list[int]:
+        """Возвращает ID статей с наибольшим рейтингом"""
+        return [-key[1] for key in self._top[:limit]]
+
+    def trending(self, limit: int) -> list[int]:
+        """Возвращает ID статей с наибольшей затухающей оценкой"""
+        return [-key[1] for key in self._trending[:limit]]
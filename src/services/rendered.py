@@ -0,0 +1,86 @@
+from datetime import datetime
+from time import monotonic
+from typing import Hashable, NamedTuple
+
+from .cache import LRUCache
+
+
+class RenderedResponse(NamedTuple):
+    """Готовое тело JSON-ответа вместе с валидаторами для условных запросов"""
+    body: bytes
+    etag: str
+    last_modified: datetime | None = None
+
+
+def _sizeof(rendered: RenderedResponse) -> int:
+    return len(rendered.body)
+
+
+class RenderedCache:
+    """
+    Кэш закодированных JSON-ответов статей: отдельно по ID статьи и по странице списка.
+
+    Оба кэша ограничены по количеству записей и по суммарному размеру тел ответов,
+    при переполнении вытесняются самые давно использованные записи.
+    Номер поколения увеличивается при каждой инвалидации. Ответ, прочитанный из базы данных
+    до инвалидации, не сохраняется: его поколение уже устарело. С hold инвалидированные ответы
+    не сохраняются еще hold секунд, чтобы в кэш не попали устаревшие данные реплик.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, article_maxbytes: int = 0,
+                 page_maxbytes: int = 0, hold: float = 0.0):
+        """
+        Инициализация кэша.
+
+        :param maxsize: Максимальное количество записей в каждом из кэшей. 0 отключает кэш.
+        :param ttl: Время жизни записи в секундах.
+        :param article_maxbytes: Максимальный суммарный размер ответов по ID статьи в байтах.
+        :param page_maxbytes: Максимальный суммарный размер страниц списка в байтах.
+        :param hold: Сколько секунд после инвалидации не сохранять ответ статьи и страницы списка.
+        """
+        self.articles = LRUCache(maxsize=maxsize, ttl=ttl, maxbytes=article_maxbytes, sizeof=_sizeof, hold=hold)
+        self.pages = LRUCache(maxsize=maxsize, ttl=ttl, maxbytes=page_maxbytes, sizeof=_sizeof)
+        self.hold = hold
+        self.generation = 0
+        self._pages_held_until = 0.0
+
+    def get_article(self, article_id: int) -> RenderedResponse | None:
+        return self.articles.get(article_id)
+
+    def set_article(self, article_id: int, rendered: RenderedResponse, generation: int) -> None:
+        """Сохраняет ответ по ID статьи, если с начала его чтения не было инвалидаций"""
+        if generation == self.generation:
+            self.articles.set(article_id, rendered)
+
+    def get_page(self, key: Hashable) -> RenderedResponse | None:
+        return self.pages.get(key)
+
+    def set_page(self, key: Hashable, rendered: RenderedResponse, generation: int) -> None:
+        """Сохраняет страницу списка, если с начала ее чтения не было инвалидаций"""
+        if generation == self.generation and monotonic() >= self._pages_held_until:
+            self.pages.set(key, rendered)
+
+    def invalidate_article(self, article_id: int) -> None:
+        """Удаляет ответ по ID статьи и все страницы списка, в которые она могла попасть"""
+        self.articles.invalidate(article_id)
+        self.invalidate_pages()
+
+    def invalidate_pages(self) -> None:
+        """Удаляет все страницы списка"""
+        self.generation += 1
+        self.pages.clear()
+        if self.hold > 0:
+            self._pages_held_until = monotonic() + self.hold
+
+    def clear(self) -> None:
+        """Удаляет все записи"""
+        self.generation += 1
+        self.articles.clear()
+        self.pages.clear()
+
+    def stats(self) -> dict:
+        """Возвращает показатели кэшей ответов по ID и страниц списка"""
+        return {
+            "articles": self.articles.stats(),
+            "pages": self.pages.stats(),
+        }
@@ -0,0 +1,59 @@
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.repositories import UserRepository
+from src.schemas import AccessLevel
+from .cache import LRUCache
+
+# Роли по возрастанию прав: роль дает доступ ко всему, что доступно ролям левее
+ROLE_LEVELS = {
+    AccessLevel.user.value: 0,
+    AccessLevel.admin.value: 1,
+    AccessLevel.superuser.value: 2,
+}
+
+
+def has_role(user_role: str, required_role: str) -> bool:
+    """Проверяет, что роль пользователя не ниже требуемой"""
+    return ROLE_LEVELS.get(user_role, -1) >= ROLE_LEVELS[required_role]
+
+
+class RoleCache:
+    """
+    Кэш текущих ролей и версий ролей пользователей с коротким временем жизни.
+
+    Токен доступа несет роль и версию роли, поэтому проверка прав не требует запроса к базе данных.
+    Кэш позволяет отозвать права раньше истечения токена: токен с устаревшей версией роли
+    перестает приниматься не позже чем через ttl секунд после смены роли.
+    """
+
+    def __init__(self, repository: UserRepository, maxsize: int = 10000, ttl: float = 30.0):
+        """
+        :param repository: Репозиторий для чтения ролей пользователей.
+        :param maxsize: Максимальное количество пользователей в кэше.
+        :param ttl: Время жизни записи в секундах. 0 отключает проверку версии роли: права определяются только по токену.
+        """
+        self.repository = repository
+        self.enabled = ttl > 0
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    async def current(self, session: AsyncSession, user_uuid: UUID) -> tuple[AccessLevel, int] | None:
+        """Возвращает текущие роль и версию роли пользователя из кэша или из базы данных"""
+        role = self.cache.get(user_uuid)
+        if role is None:
+            role = await self.repository.get_role(session, user_uuid)
+            if role is not None:
+                self.remember(user_uuid, *role)
+        return role
+
+    def remember(self, user_uuid: UUID, role: AccessLevel, role_version: int) -> None:
+        """Сохраняет роль, например, только что прочитанную при выдаче токена"""
+        self.cache.set(user_uuid, (role, role_version))
+
+    def invalidate(self, user_uuid: UUID) -> None:
+        """Удаляет роль пользователя из кэша после ее смены в этом процессе"""
+        self.cache.invalidate(user_uuid)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, **self.cache.stats()}
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Объединение одновременных одинаковых запросов.
+
+    Первый вызов с ключом выполняет функцию, остальные вызовы с тем же ключом, пришедшие
+    до ее завершения, ждут и получают тот же результат или то же исключение.
+    Если первый вызов отменен, ожидающие повторяют попытку, и один из них выполняет функцию сам.
+    Ведет счетчики выполненных и объединенных вызовов.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполняет fn или присоединяется к уже выполняющемуся вызову с тем же ключом.
+
+        :param key: Ключ, по которому вызовы считаются одинаковыми.
+        :param fn: Функция без аргументов, возвращающая корутину.
+        :return: Результат fn.
+        """
+        while (future := self._calls.get(key)) is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.calls += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        """Возвращает количество выполняющихся, выполненных и объединенных вызовов"""
+        requests = self.calls + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "coalesced_rate": self.coalesced / requests if requests else 0.0,
+        }
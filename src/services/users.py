@@ -1,7 +1,10 @@
+from typing import AsyncIterator
+from uuid import UUID
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repositories import UserRepository
-from src.schemas import UserOut
+from src.schemas import AccessLevel, UserOut, UserProfile
 
 
 class UserService:
@@ -18,10 +21,19 @@ class UserService:
         self.repository = repository
 
 
-    async def get_user(self, username: str, session: AsyncSession) -> UserOut:
-        """Получает информацию о пользователе по имени"""
+    async def get_user(self, username: str, session: AsyncSession) -> UserProfile | None:
+        """Получает информацию о пользователе по имени вместе со статистикой его статей"""
         return await self.repository.get_user(username=username, session=session)
 
     async def get_users(self, session: AsyncSession) -> list[UserOut]:
         """ Получает список всех пользователей"""
-        return await self.repository.get_users(session=session)
\ No newline at end of file
+        return await self.repository.get_users(session=session)
+
+    async def set_role(self, session: AsyncSession, user_uuid: UUID, role: AccessLevel) -> int:
+        """Меняет роль пользователя и возвращает новую версию роли"""
+        return await self.repository.set_role(session, user_uuid, role)
+
+    async def stream_users(self, session: AsyncSession) -> AsyncIterator[list[UserOut]]:
+        """Потоково получает всех пользователей порциями"""
+        async for chunk in self.repository.stream_users(session=session):
+            yield chunk
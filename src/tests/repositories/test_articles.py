@@ -1,11 +1,16 @@
+import asyncio
+from datetime import datetime, timedelta
+from uuid import uuid4
+
 from fastapi import HTTPException, status
 from unittest.mock import AsyncMock
 
 import pytest
+from sqlalchemy import event, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.repositories import ArticleRepository
-from src.schemas import ArticleUpdate
+from src.repositories import Article, ArticleRepository, AuthorStats, AuthorStatsRepository
+from src.schemas import ArticleUpdate, ArticleCreate, ArticleFilter
 from .fake_database import FakeDatabase
 
 
@@ -29,9 +34,136 @@ async def db_session(get_session) -> AsyncSession:
 @pytest.mark.anyio
 async def test_get_articles(db_session):
     article_repo = ArticleRepository()
-    articles = await article_repo.get_articles(db_session)
-    assert isinstance(articles, list)
-    assert len(articles) > 0
+    page = await article_repo.get_articles(db_session)
+    assert isinstance(page.items, list)
+    assert len(page.items) > 0
+
+
+@pytest.mark.anyio
+async def test_get_articles_core_rows(db_session):
+    article_repo = ArticleRepository()
+    page = await article_repo.get_articles(db_session, limit=5, embed_author=True)
+    assert len(page.items) == 5
+    assert len(db_session.identity_map) == 0
+
+
+@pytest.mark.anyio
+async def test_get_articles_pagination(db_session):
+    article_repo = ArticleRepository()
+    first_page = await article_repo.get_articles(db_session, limit=3)
+    assert len(first_page.items) == 3
+    assert first_page.next_cursor is not None
+
+    second_page = await article_repo.get_articles(db_session, limit=3, cursor=first_page.next_cursor)
+    first_ids = {article.id for article in first_page.items}
+    second_ids = {article.id for article in second_page.items}
+    assert second_ids
+    assert first_ids.isdisjoint(second_ids)
+
+
+@pytest.mark.anyio
+async def test_get_articles_fields(db_session):
+    article_repo = ArticleRepository()
+    page = await article_repo.get_articles(db_session, limit=3, fields=["title", "rating"])
+    assert len(page.items) == 3
+    for article in page.items:
+        assert article.model_fields_set == {"id", "title", "rating"}
+
+
+@pytest.mark.anyio
+async def test_get_articles_filters(db_session):
+    article_repo = ArticleRepository()
+    filters = ArticleFilter(min_rating=2.0, max_rating=4.0)
+    page = await article_repo.get_articles(db_session, limit=100, filters=filters)
+    assert all(2.0 <= article.rating <= 4.0 for article in page.items)
+
+    author_id = (await article_repo.get_articles(db_session, limit=1)).items[0].author_id
+    page = await article_repo.get_articles(db_session, limit=100, filters=ArticleFilter(author_id=author_id))
+    assert page.items
+    assert all(article.author_id == author_id for article in page.items)
+
+
+@pytest.fixture
+def count_statements(db_session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.anyio
+async def test_get_articles_embed_author_single_query(db_session, count_statements):
+    article_repo = ArticleRepository()
+    for limit in (1, 5, 10):
+        count_statements.clear()
+        page = await article_repo.get_articles(db_session, limit=limit, embed_author=True)
+        assert len(count_statements) == 1
+        assert len(page.items) == limit
+        assert all(article.author is not None for article in page.items)
+
+
+@pytest.mark.anyio
+async def test_get_author_articles_single_query(db_session, count_statements):
+    article_repo = ArticleRepository()
+    page = await article_repo.get_articles(db_session, limit=1, embed_author=True)
+    author_name = page.items[0].author.name
+
+    for limit in (1, 5, 10):
+        count_statements.clear()
+        page = await article_repo.get_author_articles(db_session, author_name=author_name, limit=limit)
+        assert len(count_statements) == 1
+        assert all(article.author.name == author_name for article in page.items)
+
+
+@pytest.mark.anyio
+async def test_get_author_articles_not_found(db_session):
+    article_repo = ArticleRepository()
+    with pytest.raises(HTTPException) as exc:
+        await article_repo.get_author_articles(db_session, author_name="nobody")
+    assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_search_articles(db_session):
+    article_repo = ArticleRepository()
+    first_page = await article_repo.search_articles(db_session, query="Article", limit=2)
+    assert len(first_page.items) == 2
+    assert first_page.next_cursor is not None
+
+    second_page = await article_repo.search_articles(db_session, query="Article", limit=2,
+                                                     cursor=first_page.next_cursor)
+    assert {article.id for article in first_page.items}.isdisjoint({article.id for article in second_page.items})
+
+
+@pytest.mark.anyio
+async def test_search_articles_not_found(db_session):
+    article_repo = ArticleRepository()
+    page = await article_repo.search_articles(db_session, query="nonexistentword")
+    assert page.items == []
+    assert page.next_cursor is None
+
+
+@pytest.mark.anyio
+async def test_get_articles_invalid_cursor(db_session):
+    article_repo = ArticleRepository()
+    with pytest.raises(HTTPException) as exc_info:
+        await article_repo.get_articles(db_session, cursor="not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_get_articles_by_ids(db_session):
+    article_repo = ArticleRepository()
+    keys = await article_repo.get_ranking_keys(db_session)
+    ids = [row.id for row in keys[:3]][::-1]
+
+    articles = await article_repo.get_articles_by_ids(db_session, [*ids, 999999])
+    assert [article.id for article in articles] == ids
 
 
 @pytest.mark.anyio
@@ -52,6 +184,53 @@ async def test_get_article_by_id_not_found(db_session):
     assert exc_info.value.status_code == 404
 
 
+@pytest.mark.anyio
+async def test_update_article(db_session):
+    article_repo = ArticleRepository()
+    article = await article_repo.get_article_by_id(db_session, 3)
+    created_at, author_id = article.created_at, article.author_id
+    article_update = ArticleUpdate(id=3, title="Updated", text="Updated text", updated_at=datetime.now(),
+                                   version=article.version)
+
+    updated = await article_repo.update_article(db_session, article_update, 3)
+
+    assert updated.title == "Updated"
+    assert updated.created_at == created_at
+    assert updated.author_id == author_id
+    assert updated.version == article_update.version + 1
+
+
+@pytest.mark.anyio
+async def test_update_article_stale_version(db_session):
+    article_repo = ArticleRepository()
+    article = await article_repo.get_article_by_id(db_session, 4)
+    article_update = ArticleUpdate(id=4, title="Updated", text="Updated text", updated_at=datetime.now(),
+                                   version=article.version)
+    await article_repo.update_article(db_session, article_update, 4)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await article_repo.update_article(db_session, article_update, 4)
+    assert exc_info.value.status_code == 409
+
+
+@pytest.mark.anyio
+async def test_update_article_not_found(db_session):
+    article_repo = ArticleRepository()
+    article_update = ArticleUpdate(id=9999, title="Updated", text="Updated text", updated_at=datetime.now(),
+                                   version=1)
+    with pytest.raises(HTTPException) as exc_info:
+        await article_repo.update_article(db_session, article_update, 9999)
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_delete_article_not_found(db_session):
+    article_repo = ArticleRepository()
+    with pytest.raises(HTTPException) as exc_info:
+        await article_repo.delete_article(db_session, 9999)
+    assert exc_info.value.status_code == 404
+
+
 @pytest.mark.anyio
 async def test_delete_article(db_session):
     article_repo = ArticleRepository()
@@ -60,3 +239,88 @@ async def test_delete_article(db_session):
     with pytest.raises(HTTPException) as exc_info:
         await article_repo.get_article_by_id(db_session, article_id)
     assert exc_info.value.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_create_articles(db_session):
+    article_repo = ArticleRepository()
+    page = await article_repo.get_articles(db_session, limit=1)
+    author_id = page.items[0].author_id
+    articles_in = [
+        ArticleCreate(title=f"Bulk {i}", text="Bulk text", author_id=author_id, rating=3.0)
+        for i in range(5)
+    ]
+
+    created = await article_repo.create_articles(db_session, articles_in)
+
+    assert [article.title for article in created] == [f"Bulk {i}" for i in range(5)]
+    assert all(article.id is not None for article in created)
+
+
+@pytest.mark.anyio
+async def test_author_stats_follow_article_writes(db_session):
+    article_repo = ArticleRepository()
+    page = await article_repo.get_articles(db_session, limit=1)
+    author_id = page.items[0].author_id
+
+    async def get_stats():
+        stats = await db_session.get(AuthorStats, author_id, populate_existing=True)
+        return (stats.article_count, stats.rating_sum) if stats is not None else (0, 0.0)
+
+    count, rating_sum = await get_stats()
+
+    article = await article_repo.create_article(
+        db_session, ArticleCreate(title="Stats", text="Stats text", author_id=author_id, rating=4.0)
+    )
+    assert await get_stats() == (count + 1, pytest.approx(rating_sum + 4.0))
+
+    await article_repo.update_article(
+        db_session,
+        ArticleUpdate(id=article.id, title="Stats", text="Stats text", author_id=author_id, rating=2.0,
+                      updated_at=datetime.now(), version=article.version),
+        article.id,
+    )
+    assert await get_stats() == (count + 1, pytest.approx(rating_sum + 2.0))
+
+    await article_repo.delete_article(db_session, article.id)
+    assert await get_stats() == (count, pytest.approx(rating_sum))
+
+
+@pytest.mark.anyio
+async def test_author_stats_last_published_concurrent_writes(get_session, db_session):
+    stats_repo = AuthorStatsRepository()
+    page = await ArticleRepository().get_articles(db_session, limit=1)
+    author_id = page.items[0].author_id
+    now = datetime.now()
+
+    async with get_session() as newer, get_session() as older:
+        newer.add(Article(title="Newer", text="Text", author_id=author_id, rating=1.0,
+                          created_at=now + timedelta(days=1)))
+        await newer.flush()
+        await stats_repo.apply(newer, {author_id: (1, 1.0)})
+
+        older.add(Article(title="Older", text="Text", author_id=author_id, rating=1.0,
+                          created_at=now - timedelta(days=1)))
+        await older.flush()
+        blocked = asyncio.create_task(stats_repo.apply(older, {author_id: (1, 1.0)}))
+        await asyncio.sleep(0.5)
+        assert not blocked.done()
+
+        await newer.commit()
+        await blocked
+        await older.commit()
+
+    async with get_session() as session:
+        stats = await session.get(AuthorStats, author_id)
+        latest = await session.scalar(select(func.max(Article.created_at)).where(Article.author_id == author_id))
+        assert stats.last_published_at == latest == now + timedelta(days=1)
+
+
+@pytest.mark.anyio
+async def test_find_existing_authors(db_session):
+    article_repo = ArticleRepository()
+    page = await article_repo.get_articles(db_session, limit=1)
+    author_id = page.items[0].author_id
+
+    assert await article_repo.find_existing_authors(db_session, {author_id, uuid4()}) == {author_id}
+    assert await article_repo.find_existing_authors(db_session, set()) == set()
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from src.repositories.cursor import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 1, 26, 15, 41, 36, 954484)
+
+    cursor = encode_cursor(created_at, 42)
+
+    assert decode_cursor(cursor, datetime, int) == (created_at, 42)
+
+
+def test_cursor_invalid():
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("not-a-cursor", datetime, int)
+
+    assert exc_info.value.status_code == 400
+
+
+def test_cursor_wrong_key_length():
+    cursor = encode_cursor(1.0, 2, 3)
+
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, datetime, int)
+
+    assert exc_info.value.status_code == 400
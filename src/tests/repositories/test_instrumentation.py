@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+from src.repositories.instrumentation import OTHER_FINGERPRINT, QueryStats, fingerprint
+
+
+def test_fingerprint_normalizes_parameters_and_lists():
+    first = fingerprint("SELECT a.id FROM articles AS a\n  WHERE a.id IN ($1, $2, $3) AND a.rating > $4 LIMIT 20")
+    second = fingerprint("SELECT a.id FROM articles AS a WHERE a.id IN ($1, $2) AND a.rating > $3 LIMIT 5")
+
+    assert first == second == "SELECT a.id FROM articles AS a WHERE a.id IN (?...) AND a.rating > ? LIMIT ?"
+
+
+def test_query_stats_histogram():
+    stats = QueryStats(slow_ms=1000)
+
+    for elapsed_ms in (0.5, 3, 3, 40, 7000):
+        stats.record("SELECT * FROM users WHERE name = $1", elapsed_ms)
+
+    statement = stats.stats()["statements"][0]
+    assert statement["fingerprint"] == "SELECT * FROM users WHERE name = ?"
+    assert statement["count"] == 5
+    assert statement["max_ms"] == 7000
+    assert statement["p50_ms"] == 5
+    assert statement["buckets"]["le_1"] == 1
+    assert statement["buckets"]["le_5"] == 2
+    assert statement["buckets"]["inf"] == 1
+    assert stats.stats()["slow"] == 1
+
+
+def test_query_stats_logs_slow_and_sampled():
+    stats = QueryStats(slow_ms=100, sample_rate=0.5)
+
+    with patch("src.repositories.instrumentation.logger") as logger, \
+            patch("src.repositories.instrumentation.random.random", side_effect=[0.9, 0.1]):
+        stats.record("SELECT 1", 150)
+        stats.record("SELECT 1", 1)
+        stats.record("SELECT 1", 1)
+
+    assert logger.warning.call_count == 1
+    assert logger.info.call_count == 1
+
+
+def test_query_stats_limits_fingerprints():
+    stats = QueryStats(max_fingerprints=2)
+
+    for table in ("a", "b", "c", "d"):
+        stats.record(f"SELECT * FROM {table}", 1)
+
+    assert set(stats.histograms) == {"SELECT * FROM a", "SELECT * FROM b", OTHER_FINGERPRINT}
+    assert stats.histograms[OTHER_FINGERPRINT].count == 2
+
+
+def test_query_stats_reset():
+    stats = QueryStats()
+    stats.record("SELECT 1", 1)
+
+    stats.reset()
+
+    assert stats.stats()["queries"] == 0
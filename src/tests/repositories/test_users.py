@@ -2,9 +2,11 @@ from fastapi import HTTPException, status
 from unittest.mock import AsyncMock
 
 import pytest
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.repositories import UserRepository
+from src.repositories import User, UserRepository
+from src.schemas import AccessLevel
 from .fake_database import FakeDatabase
 
 
@@ -45,6 +47,15 @@ async def test_get_user(db_session):
     assert user.name == username
 
 
+@pytest.mark.anyio
+async def test_get_user_loads_stats(db_session):
+    user_repo = UserRepository()
+
+    user = await user_repo.get_user("User5", db_session)
+
+    assert "stats" in user.__dict__
+
+
 @pytest.mark.anyio
 async def test_get_user_none(db_session):
     user_repo = UserRepository()
@@ -84,4 +95,48 @@ async def test_get_users_faild_db(db_session):
     with pytest.raises(HTTPException) as exc_info:
         await user_repo.get_users(db_session)
 
-    assert exc_info.value.status_code == 500
\ No newline at end of file
+    assert exc_info.value.status_code == 500
+
+@pytest.mark.anyio
+async def test_find_taken(db_session):
+    user_repo = UserRepository()
+
+    assert await user_repo.find_taken(db_session, name="User5", email="user1@example.com") == (True, True)
+    assert await user_repo.find_taken(db_session, name="User5", email="free@example.com") == (True, False)
+    assert await user_repo.find_taken(db_session, name="free", email=None) == (False, False)
+
+
+@pytest.mark.anyio
+async def test_stream_identities(db_session):
+    user_repo = UserRepository()
+
+    identities = [identity async for chunk in user_repo.stream_identities(db_session, chunk_size=3)
+                  for identity in chunk]
+
+    assert ("User5", "user5@example.com") in identities
+    assert len(identities) == len(await user_repo.get_users(db_session))
+
+
+@pytest.mark.anyio
+async def test_set_role_bumps_role_version(db_session):
+    user_repo = UserRepository()
+    user = await user_repo.get_user("User5", db_session)
+    role, role_version = await user_repo.get_role(db_session, user.uuid)
+
+    new_version = await user_repo.set_role(db_session, user.uuid, AccessLevel.admin)
+
+    assert new_version == role_version + 1
+    assert await user_repo.get_role(db_session, user.uuid) == (AccessLevel.admin, role_version + 1)
+
+
+@pytest.mark.anyio
+async def test_direct_role_change_bumps_role_version(db_session):
+    user_repo = UserRepository()
+    user = await user_repo.get_user("User6", db_session)
+    role, role_version = await user_repo.get_role(db_session, user.uuid)
+    new_role = AccessLevel.user if role == AccessLevel.admin else AccessLevel.admin
+
+    await db_session.execute(update(User).where(User.uuid == user.uuid).values(role=new_role))
+    await db_session.commit()
+
+    assert await user_repo.get_role(db_session, user.uuid) == (new_role, role_version + 1)
@@ -0,0 +1,11 @@
+import pytest
+
+from src.depends import article_service
+
+
+@pytest.fixture(autouse=True)
+def clear_rendered_cache():
+    """Закодированные ответы кэшируются между запросами, а сервис в тестах подменяется моками"""
+    article_service.rendered.clear()
+    yield
+    article_service.rendered.clear()
@@ -0,0 +1,67 @@
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from src.depends import READ_PRIMARY_COOKIE, reads_from_primary
+from src.repositories import db
+from src.routing.consistency import ReadYourWritesMiddleware
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(db, "primary_window", 5.0)
+
+    test_app = FastAPI()
+    test_app.add_middleware(ReadYourWritesMiddleware)
+
+    @test_app.get("/")
+    async def read(request: Request):
+        return {"primary": reads_from_primary(request)}
+
+    @test_app.post("/")
+    async def write():
+        return {}
+
+    @test_app.post("/auth/")
+    async def login():
+        return {}
+
+    @test_app.post("/fail")
+    async def fail():
+        raise HTTPException(status_code=400)
+
+    return TestClient(test_app)
+
+
+def test_read_does_not_set_cookie(client):
+    response = client.get("/")
+
+    assert READ_PRIMARY_COOKIE not in response.cookies
+    assert response.json() == {"primary": False}
+
+
+def test_write_routes_reads_to_primary(client):
+    write = client.post("/")
+    read = client.get("/")
+
+    assert READ_PRIMARY_COOKIE in write.cookies
+    assert read.json() == {"primary": True}
+
+
+def test_write_does_not_route_other_clients_to_primary(client):
+    client.post("/")
+    client.cookies.clear()
+
+    assert client.get("/").json() == {"primary": False}
+
+
+def test_login_does_not_set_cookie(client):
+    response = client.post("/auth/")
+
+    assert READ_PRIMARY_COOKIE not in response.cookies
+
+
+def test_failed_write_does_not_set_cookie(client):
+    response = client.post("/fail")
+
+    assert READ_PRIMARY_COOKIE not in response.cookies
@@ -0,0 +1,32 @@
+import json
+from datetime import datetime
+from uuid import UUID
+
+from src.routing.responses import FastJSONResponse
+from src.schemas import Article, ArticlePage, ArticlePartial
+
+
+article = Article(id=1, title="testtitle1", text="testtext1", author_id=UUID("71367bfa-b122-4c9a-ba45-afabdf646998"),
+                  rating=4.5, created_at=datetime(2025, 1, 26, 15, 41, 36, 954484))
+
+
+def test_fast_json_response_matches_model_dump_json():
+    response = FastJSONResponse([article])
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == [json.loads(article.model_dump_json())]
+
+
+def test_fast_json_response_exclude_unset():
+    page = ArticlePage(items=[ArticlePartial(id=1, title="testtitle1")], next_cursor=None)
+
+    response = FastJSONResponse(page, exclude_unset=True, headers={"ETag": '"etag"'})
+
+    assert json.loads(response.body) == {"items": [{"id": 1, "title": "testtitle1"}], "next_cursor": None}
+    assert response.headers["etag"] == '"etag"'
+
+
+def test_fast_json_response_nested_models():
+    response = FastJSONResponse({"user": article, "is_owner": True})
+
+    assert json.loads(response.body)["user"]["author_id"] == "71367bfa-b122-4c9a-ba45-afabdf646998"
@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import AsyncMock
 from fastapi.testclient import TestClient
 from src.app import app
-from src.depends import get_articles_service, get_session
+from src.depends import article_service, get_articles_service, get_read_session
 
 
 
@@ -25,7 +25,8 @@ article_data = {
             "rating": 0,
             "id": 1,
             "created_at": "2025-01-26T15:41:36.954484",
-            "updated_at": None
+            "updated_at": None,
+            "version": 1
         }
 
 
@@ -33,7 +34,7 @@ article_data = {
 def test_get_article_success(mock_articles_service, mock_session):
 
     app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
-    app.dependency_overrides[get_session] = lambda: mock_session
+    app.dependency_overrides[get_read_session] = lambda: mock_session
     mock_articles_service.get_article_by_id.return_value = article_data
 
     client = TestClient(app)
@@ -50,7 +51,7 @@ def test_get_article_success(mock_articles_service, mock_session):
 def test_get_article_fail(mock_articles_service, mock_session):
 
     app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
-    app.dependency_overrides[get_session] = lambda: mock_session
+    app.dependency_overrides[get_read_session] = lambda: mock_session
     mock_articles_service.get_article_by_id.return_value = None
 
     client = TestClient(app)
@@ -60,3 +61,66 @@ def test_get_article_fail(mock_articles_service, mock_session):
 
     assert response.status_code == 404
     assert response.json() == {"detail": "Article not found"}
+
+
+@pytest.mark.asyncio
+def test_get_article_etag(mock_articles_service, mock_session):
+
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    mock_articles_service.get_article_by_id.return_value = article_data
+
+    client = TestClient(app)
+    response = client.get("/article/1")
+    etag = response.headers["ETag"]
+    not_modified = client.get("/article/1", headers={"If-None-Match": etag})
+    modified = client.get("/article/1", headers={"If-None-Match": '"stale"'})
+
+    app.dependency_overrides = {}
+
+    assert "Last-Modified" in response.headers
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+    assert modified.status_code == 200
+    assert modified.json() == article_data
+
+
+@pytest.mark.asyncio
+def test_get_article_if_modified_since(mock_articles_service, mock_session):
+
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    mock_articles_service.get_article_by_id.return_value = article_data
+
+    client = TestClient(app)
+    response = client.get("/article/1")
+    not_modified = client.get("/article/1", headers={"If-Modified-Since": response.headers["Last-Modified"]})
+    modified = client.get("/article/1", headers={"If-Modified-Since": "Sat, 01 Jan 2000 00:00:00 GMT"})
+
+    app.dependency_overrides = {}
+
+    assert not_modified.status_code == 304
+    assert modified.status_code == 200
+
+
+@pytest.mark.asyncio
+def test_get_article_rendered_cache(mock_articles_service, mock_session):
+
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    mock_articles_service.get_article_by_id.return_value = article_data
+
+    client = TestClient(app)
+    response = client.get("/article/1")
+    cached = client.get("/article/1")
+    article_service.rendered.invalidate_article(1)
+    after_write = client.get("/article/1")
+
+    app.dependency_overrides = {}
+
+    assert cached.json() == article_data
+    assert cached.headers["ETag"] == response.headers["ETag"]
+    assert cached.headers["Last-Modified"] == response.headers["Last-Modified"]
+    assert after_write.status_code == 200
+    assert mock_articles_service.get_article_by_id.await_count == 2
@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import AsyncMock
+from fastapi.testclient import TestClient
+from src.app import app
+from src.depends import get_articles_service, get_read_session
+
+
+@pytest.fixture
+def mock_articles_service():
+    mock_service = AsyncMock()
+    return mock_service
+
+
+@pytest.fixture
+def mock_session():
+    mock_session = AsyncMock()
+    return mock_session
+
+
+article_data = {
+    "id": 1,
+    "title": "testtitle1",
+    "text": "testtext1",
+    "author_id": "71367bfa-b122-4c9a-ba45-afabdf646998",
+    "rating": 5,
+    "created_at": "2025-01-26T15:41:36.954484",
+    "updated_at": None,
+    "version": 1
+}
+
+
+@pytest.mark.asyncio
+def test_get_top_articles_success(mock_articles_service, mock_session):
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    mock_articles_service.get_top_articles.return_value = [article_data]
+
+    client = TestClient(app)
+    response = client.get("/article/top", params={"limit": 5})
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.json() == [article_data]
+    mock_articles_service.get_top_articles.assert_called_once_with(mock_session, limit=5)
+
+
+@pytest.mark.asyncio
+def test_get_trending_articles_success(mock_articles_service, mock_session):
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    mock_articles_service.get_trending_articles.return_value = [article_data]
+
+    client = TestClient(app)
+    response = client.get("/article/trending")
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.json() == [article_data]
+    mock_articles_service.get_trending_articles.assert_called_once_with(mock_session, limit=10)
+
+
+@pytest.mark.asyncio
+def test_get_top_articles_limit_too_large(mock_articles_service, mock_session):
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+
+    client = TestClient(app)
+    response = client.get("/article/top", params={"limit": 1000})
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 422
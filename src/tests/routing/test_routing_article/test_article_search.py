@@ -0,0 +1,59 @@
+import pytest
+from unittest.mock import AsyncMock
+from fastapi.testclient import TestClient
+from src.app import app
+from src.depends import get_articles_service, get_read_session
+
+
+@pytest.fixture
+def mock_articles_service():
+    mock_service = AsyncMock()
+    return mock_service
+
+
+@pytest.fixture
+def mock_session():
+    mock_session = AsyncMock()
+    return mock_session
+
+
+article_data = {
+    "id": 1,
+    "title": "testtitle1",
+    "text": "testtext1",
+    "author_id": "71367bfa-b122-4c9a-ba45-afabdf646998",
+    "rating": 0,
+    "created_at": "2025-01-26T15:41:36.954484",
+    "updated_at": None,
+    "version": 1
+}
+
+
+@pytest.mark.asyncio
+def test_search_articles_success(mock_articles_service, mock_session):
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    mock_articles_service.search_articles.return_value = {"items": [article_data], "next_cursor": "cursor"}
+
+    client = TestClient(app)
+    response = client.get("/article/search", params={"q": "testtitle1", "limit": 1})
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.json() == {"items": [article_data], "next_cursor": "cursor"}
+    mock_articles_service.search_articles.assert_called_once_with(mock_session, query="testtitle1", limit=1,
+                                                                  cursor=None)
+
+
+@pytest.mark.asyncio
+def test_search_articles_empty_query(mock_articles_service, mock_session):
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+
+    client = TestClient(app)
+    response = client.get("/article/search", params={"q": ""})
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 422
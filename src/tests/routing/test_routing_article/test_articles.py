@@ -1,8 +1,12 @@
+import json
+from contextlib import asynccontextmanager
+
 import pytest
 from unittest.mock import AsyncMock
 from fastapi.testclient import TestClient
 from src.app import app
-from src.depends import get_articles_service, get_session
+from src.depends import article_service, get_articles_service, get_read_session, get_read_session_factory
+from src.schemas import ArticleFilter
 
 
 
@@ -33,7 +37,8 @@ def test_get_articles_success(mock_articles_service, mock_session):
             "rating": 0,
             "id": 1,
             "created_at": "2025-01-26T15:41:36.954484",
-            "updated_at": None
+            "updated_at": None,
+            "version": 1
         },
         {
             "title": "testtitle",
@@ -42,7 +47,8 @@ def test_get_articles_success(mock_articles_service, mock_session):
             "rating": 0,
             "id": 2,
             "created_at": "2025-01-26T15:41:36.954484",
-            "updated_at": None
+            "updated_at": None,
+            "version": 1
         },
         {
             "title": "testtitle",
@@ -51,13 +57,14 @@ def test_get_articles_success(mock_articles_service, mock_session):
             "rating": 0,
             "id": 3,
             "created_at": "2025-01-26T15:41:36.954484",
-            "updated_at": None
+            "updated_at": None,
+            "version": 1
         }
     ]
-    app.dependency_overrides[get_session] = lambda: mock_session
+    app.dependency_overrides[get_read_session] = lambda: mock_session
     app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
 
-    mock_articles_service.get_articles.return_value = articles_data
+    mock_articles_service.get_articles.return_value = {"items": articles_data, "next_cursor": None}
 
     client = TestClient(app)
     response = client.get("/article")
@@ -67,4 +74,248 @@ def test_get_articles_success(mock_articles_service, mock_session):
     print(response.json())
 
     assert response.status_code == 200
-    assert response.json() == articles_data
\ No newline at end of file
+    assert response.json() == {"items": articles_data, "next_cursor": None}
+    mock_articles_service.get_articles.assert_called_once_with(mock_session, limit=20, cursor=None, fields=None,
+                                                               filters=ArticleFilter(), embed_author=False)
+
+
+@pytest.mark.asyncio
+def test_get_articles_etag(mock_articles_service, mock_session):
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+
+    articles_data = [{"id": 1, "title": "testtitle1"}]
+    mock_articles_service.get_articles.return_value = {"items": articles_data, "next_cursor": None}
+
+    client = TestClient(app)
+    response = client.get("/article", params={"fields": "title"})
+    not_modified = client.get("/article", params={"fields": "title"},
+                              headers={"If-None-Match": response.headers["ETag"]})
+
+    mock_articles_service.get_articles.return_value = {"items": [{"id": 1, "title": "changed"}],
+                                                       "next_cursor": None}
+    article_service.rendered.invalidate_pages()
+    modified = client.get("/article", params={"fields": "title"},
+                          headers={"If-None-Match": response.headers["ETag"]})
+
+    app.dependency_overrides = {}
+
+    assert not_modified.status_code == 304
+    assert modified.status_code == 200
+    assert modified.headers["ETag"] != response.headers["ETag"]
+
+
+@pytest.mark.asyncio
+def test_get_articles_next_page(mock_articles_service, mock_session):
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+
+    mock_articles_service.get_articles.return_value = {"items": [], "next_cursor": None}
+
+    client = TestClient(app)
+    response = client.get("/article", params={"limit": 5, "cursor": "next_cursor"})
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    mock_articles_service.get_articles.assert_called_once_with(mock_session, limit=5, cursor="next_cursor", fields=None,
+                                                               filters=ArticleFilter(), embed_author=False)
+
+
+@pytest.mark.asyncio
+def test_get_articles_fields(mock_articles_service, mock_session):
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+
+    articles_data = [
+        {"id": 1, "title": "testtitle1", "rating": 4.5},
+        {"id": 2, "title": "testtitle2", "rating": 0.0},
+    ]
+    mock_articles_service.get_articles.return_value = {"items": articles_data, "next_cursor": None}
+
+    client = TestClient(app)
+    response = client.get("/article", params=[("fields", "title"), ("fields", "rating")])
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.json() == {"items": articles_data, "next_cursor": None}
+    mock_articles_service.get_articles.assert_called_once_with(mock_session, limit=20, cursor=None,
+                                                               fields=["title", "rating"], filters=ArticleFilter(), embed_author=False)
+
+
+@pytest.mark.asyncio
+def test_get_articles_filters(mock_articles_service, mock_session):
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+
+    mock_articles_service.get_articles.return_value = {"items": [], "next_cursor": None}
+    params = {
+        "author_id": "71367bfa-b122-4c9a-ba45-afabdf646998",
+        "min_rating": 4,
+        "created_after": "2025-01-01T00:00:00",
+    }
+
+    client = TestClient(app)
+    response = client.get("/article", params=params)
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    mock_articles_service.get_articles.assert_called_once_with(mock_session, limit=20, cursor=None, fields=None,
+                                                               filters=ArticleFilter(**params), embed_author=False)
+
+
+@pytest.mark.asyncio
+def test_get_articles_embed_author(mock_articles_service, mock_session):
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+
+    articles_data = [{
+        "id": 1,
+        "title": "testtitle1",
+        "text": "testtext1",
+        "author_id": "71367bfa-b122-4c9a-ba45-afabdf646998",
+        "rating": 0,
+        "created_at": "2025-01-26T15:41:36.954484",
+        "updated_at": None,
+        "version": 1,
+        "author": {"name": "testname", "role": "user"},
+    }]
+    mock_articles_service.get_articles.return_value = {"items": articles_data, "next_cursor": None}
+
+    client = TestClient(app)
+    response = client.get("/article", params={"embed": "author"})
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.json() == {"items": articles_data, "next_cursor": None}
+    mock_articles_service.get_articles.assert_called_once_with(mock_session, limit=20, cursor=None, fields=None,
+                                                               filters=ArticleFilter(), embed_author=True)
+
+
+@pytest.mark.asyncio
+def test_get_articles_invalid_filter(mock_articles_service, mock_session):
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+
+    client = TestClient(app)
+    response = client.get("/article", params={"max_rating": 10})
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+def test_get_articles_unknown_field(mock_articles_service, mock_session):
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+
+    client = TestClient(app)
+    response = client.get("/article", params={"fields": "password_hash"})
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+def test_get_articles_limit_too_large(mock_articles_service, mock_session):
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+
+    client = TestClient(app)
+    response = client.get("/article", params={"limit": 1000})
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 422
+
+
+stream_data = [
+    {
+        "title": "testtitle",
+        "text": "testtext",
+        "author_id": "71367bfa-b122-4c9a-ba45-afabdf646998",
+        "rating": 0.0,
+        "id": i,
+        "created_at": "2025-01-26T15:41:36.954484",
+        "updated_at": None,
+        "version": 1
+    }
+    for i in range(1, 6)
+]
+
+
+@pytest.fixture
+def mock_session_factory(mock_session):
+    @asynccontextmanager
+    async def session_factory():
+        yield mock_session
+    return session_factory
+
+
+async def fake_stream_articles(session, filters=None):
+    yield stream_data[:3]
+    yield stream_data[3:]
+
+
+@pytest.mark.asyncio
+def test_get_articles_stream_ndjson(mock_articles_service, mock_session, mock_session_factory):
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    app.dependency_overrides[get_read_session_factory] = lambda: mock_session_factory
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+
+    mock_articles_service.stream_articles = fake_stream_articles
+
+    client = TestClient(app)
+    response = client.get("/article", headers={"Accept": "application/x-ndjson"})
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in response.text.splitlines()] == stream_data
+
+
+@pytest.mark.asyncio
+def test_get_articles_stream_json_array(mock_articles_service, mock_session, mock_session_factory):
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    app.dependency_overrides[get_read_session_factory] = lambda: mock_session_factory
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+
+    mock_articles_service.stream_articles = fake_stream_articles
+
+    client = TestClient(app)
+    response = client.get("/article", params={"stream": True})
+
+    app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.json() == stream_data
+
+
+@pytest.mark.asyncio
+def test_get_articles_rendered_cache(mock_articles_service, mock_session):
+    app.dependency_overrides[get_read_session] = lambda: mock_session
+    app.dependency_overrides[get_articles_service] = lambda: mock_articles_service
+
+    mock_articles_service.get_articles.return_value = {"items": [{"id": 1, "title": "testtitle1"}],
+                                                       "next_cursor": None}
+
+    client = TestClient(app)
+    response = client.get("/article", params={"fields": "title"})
+    cached = client.get("/article", params={"fields": "title"})
+    other_page = client.get("/article", params={"fields": "title", "limit": 5})
+    article_service.rendered.invalidate_pages()
+    after_write = client.get("/article", params={"fields": "title"})
+
+    app.dependency_overrides = {}
+
+    assert cached.content == response.content
+    assert cached.headers["ETag"] == response.headers["ETag"]
+    assert other_page.status_code == 200
+    assert after_write.status_code == 200
+    assert mock_articles_service.get_articles.await_count == 3
@@ -3,7 +3,7 @@ from pydantic import BaseModel
 from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock
 from src.app import app
-from src.depends import get_users_service, get_authentication_service, get_session
+from src.depends import get_users_service, get_authentication_service, get_read_session
 
 
 @pytest.fixture
@@ -39,7 +39,7 @@ def test_users_name_success_owner(mock_users_service, mock_authentication_servic
     }
     access_token = "test_token"
 
-    app.dependency_overrides[get_session] = lambda: mock_session
+    app.dependency_overrides[get_read_session] = lambda: mock_session
     app.dependency_overrides[get_authentication_service] = lambda: mock_authentication_service
     app.dependency_overrides[get_users_service] = lambda: mock_users_service
 
@@ -67,7 +67,7 @@ def test_users_name_success_not_owner(mock_users_service, mock_authentication_se
     }
     access_token = "test_token"
 
-    app.dependency_overrides[get_session] = lambda: mock_session
+    app.dependency_overrides[get_read_session] = lambda: mock_session
     app.dependency_overrides[get_authentication_service] = lambda: mock_authentication_service
     app.dependency_overrides[get_users_service] = lambda: mock_users_service
 
@@ -95,7 +95,7 @@ def test_users_name_success_not_token(mock_users_service, mock_authentication_se
     }
     access_token = "test_token"
 
-    app.dependency_overrides[get_session] = lambda: mock_session
+    app.dependency_overrides[get_read_session] = lambda: mock_session
     app.dependency_overrides[get_authentication_service] = lambda: mock_authentication_service
     app.dependency_overrides[get_users_service] = lambda: mock_users_service
 
@@ -124,7 +124,7 @@ def test_users_name_success_not_header(mock_users_service, mock_authentication_s
     }
     access_token = "test_token"
 
-    app.dependency_overrides[get_session] = lambda: mock_session
+    app.dependency_overrides[get_read_session] = lambda: mock_session
     app.dependency_overrides[get_authentication_service] = lambda: mock_authentication_service
     app.dependency_overrides[get_users_service] = lambda: mock_users_service
 
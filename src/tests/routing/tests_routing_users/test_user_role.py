@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+from src.app import app
+from src.depends import get_users_service, get_authentication_service, get_session
+from src.schemas import AccessLevel
+
+USER_UUID = "e16c5d2d-3959-476a-833e-6bbe720df2ef"
+
+
+@pytest.fixture
+def mock_users_service():
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_session():
+    return AsyncMock()
+
+
+def authentication_service(role: str) -> AsyncMock:
+    mock_service = AsyncMock()
+    mock_service.decode_access_token.return_value = {"sub": USER_UUID, "role": role, "rv": 1}
+    mock_service.roles = MagicMock(enabled=False)
+    return mock_service
+
+
+@pytest.fixture
+def client(mock_users_service, mock_session):
+    app.dependency_overrides[get_session] = lambda: mock_session
+    app.dependency_overrides[get_users_service] = lambda: mock_users_service
+    yield TestClient(app)
+    app.dependency_overrides = {}
+
+
+def test_set_user_role_success(client, mock_users_service, mock_session):
+    auth_service = authentication_service("superuser")
+    app.dependency_overrides[get_authentication_service] = lambda: auth_service
+    mock_users_service.set_role.return_value = 2
+
+    response = client.put(f"/users/{USER_UUID}/role", json={"role": "admin"}, headers={"x-access-token": "token"})
+
+    assert response.status_code == 200
+    assert response.json() == {"uuid": USER_UUID, "role": "admin", "role_version": 2}
+    mock_users_service.set_role.assert_awaited_once()
+    assert mock_users_service.set_role.await_args.args[2] == AccessLevel.admin
+    auth_service.roles.invalidate.assert_called_once()
+
+
+def test_set_user_role_not_enough_rights(client, mock_users_service):
+    app.dependency_overrides[get_authentication_service] = lambda: authentication_service("admin")
+
+    response = client.put(f"/users/{USER_UUID}/role", json={"role": "superuser"}, headers={"x-access-token": "token"})
+
+    assert response.status_code == 401
+    mock_users_service.set_role.assert_not_called()
@@ -1,13 +1,14 @@
+import asyncio
 from datetime import datetime
 from uuid import UUID
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repositories import Article, ArticleRepository
-from src.schemas import ArticleCreate, ArticleUpdate
-from src.services import ArticleService
+from src.schemas import ArticleCreate, ArticleUpdate, ArticlePage, Article as ArticleSchema
+from src.services import ArticleService, RenderedCache, RenderedResponse
 
 
 @pytest.fixture
@@ -29,10 +30,10 @@ article_in = ArticleCreate(title="Test Article", text="Test Content",
                            author_id=UUID("a0e2049d-d364-40a2-9696-e8af600617c3"), rating=1.0)
 article_out = Article(title="Test Article", text="Test Content",
                       author_id=UUID("a0e2049d-d364-40a2-9696-e8af600617c3"), rating=1.0, id=1,
-                      created_at=datetime.now(), updated_at=None)
+                      created_at=datetime.now(), updated_at=None, version=1)
 article_update = ArticleUpdate(title="Test Article", text="Test Content Updated",
                       author_id=UUID("a0e2049d-d364-40a2-9696-e8af600617c3"), rating=1.0, id=1,
-                      created_at=datetime.now(), updated_at=datetime.now())
+                      created_at=datetime.now(), updated_at=datetime.now(), version=1)
 
 
 
@@ -46,15 +47,56 @@ async def test_create_article(article_service, mock_repository, mock_session):
     assert result == article_out
 
 
+@pytest.mark.asyncio
+async def test_create_articles(article_service, mock_repository, mock_session):
+    mock_repository.find_existing_authors.return_value = {article_in.author_id}
+    mock_repository.create_articles.return_value = [article_out]
+    articles_in = [article_in.model_dump(), {"title": "Test Article", "rating": 10.0}]
+
+    result = await article_service.create_articles(session=mock_session, articles_in=articles_in)
+
+    mock_repository.create_articles.assert_called_once_with(session=mock_session, articles_in=[article_in])
+    assert result.created == [ArticleSchema.model_validate(article_out)]
+    assert [error.index for error in result.errors] == [1]
+    assert {error["loc"][0] for error in result.errors[0].errors} == {"text", "rating"}
+
+
+@pytest.mark.asyncio
+async def test_create_articles_unknown_author(article_service, mock_repository, mock_session):
+    mock_repository.find_existing_authors.return_value = {article_in.author_id}
+    mock_repository.create_articles.return_value = [article_out]
+    unknown = {"title": "Unknown", "text": "Text", "author_id": str(UUID(int=1)), "rating": 1.0}
+    without_author = {"title": "Random", "text": "Text", "rating": 1.0}
+    articles_in = [unknown, {"title": "Invalid"}, article_in.model_dump(), without_author]
+
+    result = await article_service.create_articles(session=mock_session, articles_in=articles_in)
+
+    mock_repository.find_existing_authors.assert_awaited_once()
+    assert mock_repository.find_existing_authors.await_args.args[1] >= {article_in.author_id, UUID(int=1)}
+    mock_repository.create_articles.assert_called_once_with(session=mock_session, articles_in=[article_in])
+    assert [error.index for error in result.errors] == [0, 1, 3]
+    assert result.errors[0].errors[0]["type"] == "author_not_found"
+
+
+@pytest.mark.asyncio
+async def test_create_articles_all_invalid(article_service, mock_repository, mock_session):
+    result = await article_service.create_articles(session=mock_session, articles_in=[{}])
+
+    mock_repository.create_articles.assert_not_called()
+    assert result.created == []
+    assert len(result.errors) == 1
+
+
 @pytest.mark.asyncio
 async def test_get_articles(article_service, mock_repository, mock_session):
-    articles = [article_out, article_out]
-    mock_repository.get_articles.return_value = articles
+    page = ArticlePage(items=[article_out, article_out], next_cursor=None)
+    mock_repository.get_articles.return_value = page
 
-    result = await article_service.get_articles(session=mock_session)
+    result = await article_service.get_articles(session=mock_session, limit=2, cursor="cursor")
 
-    mock_repository.get_articles.assert_called_once_with(mock_session)
-    assert result == articles
+    mock_repository.get_articles.assert_called_once_with(mock_session, limit=2, cursor="cursor", fields=None,
+                                                         filters=None, embed_author=False)
+    assert result == page
 
 
 
@@ -67,7 +109,33 @@ async def test_get_article_by_id(article_service, mock_repository, mock_session)
     result = await article_service.get_article_by_id(session=mock_session, article_id=article_id)
 
     mock_repository.get_article_by_id.assert_called_once_with(session=mock_session, article_id=article_id)
-    assert result == article_out
+    assert result == ArticleSchema.model_validate(article_out)
+
+
+@pytest.mark.asyncio
+async def test_get_article_by_id_cached(article_service, mock_repository, mock_session):
+    article_id = 1
+    mock_repository.get_article_by_id.return_value = article_out
+
+    await article_service.get_article_by_id(session=mock_session, article_id=article_id)
+    result = await article_service.get_article_by_id(session=mock_session, article_id=article_id)
+
+    mock_repository.get_article_by_id.assert_called_once_with(session=mock_session, article_id=article_id)
+    assert result == ArticleSchema.model_validate(article_out)
+    assert article_service.cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_update_article_invalidates_cache(article_service, mock_repository, mock_session):
+    article_id = 1
+    mock_repository.get_article_by_id.return_value = article_out
+    mock_repository.update_article.return_value = article_out
+
+    await article_service.get_article_by_id(session=mock_session, article_id=article_id)
+    await article_service.update_article(session=mock_session, article_update=article_update, article_id=article_id)
+    await article_service.get_article_by_id(session=mock_session, article_id=article_id)
+
+    assert mock_repository.get_article_by_id.call_count == 2
 
 
 @pytest.mark.asyncio
@@ -89,3 +157,157 @@ async def test_delete_article(article_service, mock_repository, mock_session):
     mock_repository.delete_article.assert_called_once_with(session=mock_session, article_id=article_id)
 
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_get_top_articles(article_service, mock_repository, mock_session):
+    mock_repository.get_ranking_keys.return_value = [article_out]
+    mock_repository.get_articles_by_ids.return_value = [article_out]
+
+    await article_service.get_top_articles(session=mock_session, limit=5)
+    result = await article_service.get_top_articles(session=mock_session, limit=5)
+
+    mock_repository.get_ranking_keys.assert_called_once_with(mock_session)
+    mock_repository.get_articles_by_ids.assert_called_with(mock_session, [article_out.id])
+    assert result == [article_out]
+
+
+@pytest.mark.asyncio
+async def test_writes_update_ranking(article_service, mock_repository, mock_session):
+    mock_repository.get_ranking_keys.return_value = []
+    mock_repository.create_article.return_value = article_out
+    await article_service.get_trending_articles(session=mock_session)
+
+    await article_service.create_article(session=mock_session, article_in=article_in)
+    assert article_service.ranking.trending(10) == [article_out.id]
+
+    await article_service.delete_article(session=mock_session, article_id=article_out.id)
+    assert article_service.ranking.trending(10) == []
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_rendered(article_service, mock_repository, mock_session):
+    rendered = RenderedResponse(b"{}", '"etag"')
+    article_service.rendered.set_article(1, rendered, article_service.rendered.generation)
+    article_service.rendered.set_page("page", rendered, article_service.rendered.generation)
+    stale_generation = article_service.rendered.generation
+
+    mock_repository.update_article.return_value = article_out
+    await article_service.update_article(session=mock_session, article_update=article_update, article_id=1)
+    article_service.rendered.set_page("page", rendered, stale_generation)
+
+    assert article_service.rendered.get_article(1) is None
+    assert article_service.rendered.get_page("page") is None
+
+
+@pytest.mark.asyncio
+async def test_get_article_by_id_coalesces_misses(article_service, mock_repository, mock_session):
+    release = asyncio.Event()
+
+    async def get_article_by_id(session, article_id):
+        await release.wait()
+        return article_out
+
+    mock_repository.get_article_by_id.side_effect = get_article_by_id
+    readers = [asyncio.create_task(article_service.get_article_by_id(session=mock_session, article_id=1))
+               for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*readers)
+
+    assert mock_repository.get_article_by_id.await_count == 1
+    assert all(result.id == article_out.id for result in results)
+    assert article_service.inflight.stats()["coalesced"] == 9
+
+
+@pytest.mark.asyncio
+async def test_read_racing_update_not_cached(article_service, mock_repository, mock_session):
+    release = asyncio.Event()
+
+    async def get_article_by_id(session, article_id):
+        await release.wait()
+        return article_out
+
+    mock_repository.get_article_by_id.side_effect = get_article_by_id
+    reader = asyncio.create_task(article_service.get_article_by_id(session=mock_session, article_id=1))
+    await asyncio.sleep(0)
+
+    mock_repository.update_article.return_value = article_out
+    await article_service.update_article(session=mock_session, article_update=article_update, article_id=1)
+    release.set()
+    await reader
+
+    assert article_service.cache.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_read_after_update_not_coalesced_with_earlier_read(article_service, mock_repository, mock_session):
+    release = asyncio.Event()
+    updated = Article(title="Updated", text="Test Content", author_id=article_out.author_id, rating=1.0, id=1,
+                      created_at=article_out.created_at, updated_at=datetime.now(), version=2)
+    rows = [article_out, updated]
+
+    async def get_article_by_id(session, article_id):
+        row = rows.pop(0)
+        await release.wait()
+        return row
+
+    mock_repository.get_article_by_id.side_effect = get_article_by_id
+    early_reader = asyncio.create_task(article_service.get_article_by_id(session=mock_session, article_id=1))
+    await asyncio.sleep(0)
+
+    mock_repository.update_article.return_value = updated
+    await article_service.update_article(session=mock_session, article_update=article_update, article_id=1)
+    late_reader = asyncio.create_task(article_service.get_article_by_id(session=mock_session, article_id=1))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await early_reader).title == article_out.title
+    assert (await late_reader).title == "Updated"
+    assert mock_repository.get_article_by_id.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_writes_hold_rendered_pages(mock_repository, mock_session):
+    article_service = ArticleService(repository=mock_repository, rendered=RenderedCache(hold=5))
+    rendered = RenderedResponse(b"{}", '"etag"')
+
+    mock_repository.update_article.return_value = article_out
+    await article_service.update_article(session=mock_session, article_update=article_update, article_id=1)
+    article_service.rendered.set_article(1, rendered, article_service.rendered.generation)
+    article_service.rendered.set_page("page", rendered, article_service.rendered.generation)
+
+    assert article_service.rendered.get_article(1) is None
+    assert article_service.rendered.get_page("page") is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_ranking_keeps_writes_made_during_load(article_service, mock_repository, mock_session):
+    release = asyncio.Event()
+
+    async def get_ranking_keys(session):
+        await release.wait()
+        return []
+
+    mock_repository.get_ranking_keys.side_effect = get_ranking_keys
+    refresh = asyncio.create_task(article_service.refresh_ranking(mock_session))
+    await asyncio.sleep(0)
+
+    mock_repository.create_article.return_value = article_out
+    await article_service.create_article(session=mock_session, article_in=article_in)
+    release.set()
+    await refresh
+
+    assert article_service.ranking.top(10) == [article_out.id]
+
+
+@pytest.mark.asyncio
+async def test_ranking_not_reloaded_on_request_path(article_service, mock_repository, mock_session):
+    mock_repository.get_ranking_keys.return_value = [article_out]
+    mock_repository.get_articles_by_ids.return_value = [article_out]
+    await article_service.get_top_articles(session=mock_session)
+
+    with patch("src.services.ranking.monotonic", return_value=10 ** 9):
+        await article_service.get_trending_articles(session=mock_session)
+
+    mock_repository.get_ranking_keys.assert_awaited_once()
@@ -1,11 +1,13 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from time import monotonic
+from unittest.mock import AsyncMock, MagicMock, patch
+from jwt import decode as jwt_decode
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from fastapi import HTTPException
-from src.services import TokenService, RegistrationService, AuthenticationService, AuthorizationService
-from src.repositories import Refresh, AuthenticationRepository
-from src.schemas import UserIn, UserOut, UserAll
+from src.services import TokenService, RegistrationService, AuthenticationService, AuthorizationService, RoleCache, LRUCache
+from src.repositories import Refresh, AuthenticationRepository, UserRepository
+from src.schemas import AccessLevel, UserIn, UserOut, UserAll
 
 
 @pytest.fixture
@@ -28,6 +30,10 @@ def registration_service(mock_repository):
     return RegistrationService(repository=mock_repository)
 
 
+async def async_chunks(rows):
+    yield rows
+
+
 @pytest.fixture
 def authentication_service(mock_repository):
     return AuthenticationService(repository=mock_repository)
@@ -93,6 +99,40 @@ async def test_decode_invalid_token(token_service):
     assert exc_info.value.detail == "Invalid token"
 
 
+@pytest.mark.asyncio
+async def test_decode_token_cached(token_service):
+    token = await token_service.create_token(data={"sub": "user_id"}, expires=datetime.now(timezone.utc) + timedelta(minutes=15))
+
+    with patch("src.services.auth.jwt_decode", wraps=jwt_decode) as decode:
+        first = await token_service.decode_token(token=token)
+        second = await token_service.decode_token(token=token)
+
+    assert first == second
+    assert decode.call_count == 1
+    assert token_service.cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_decode_token_cache_expires_with_token():
+    token_service = TokenService(cache=LRUCache(maxsize=10, ttl=300))
+    token = await token_service.create_token(data={"sub": "user_id"}, expires=datetime.now(timezone.utc) + timedelta(seconds=5))
+
+    await token_service.decode_token(token=token)
+
+    expires_at, _ = next(iter(token_service.cache._data.values()))
+    assert expires_at - monotonic() <= 5
+
+
+@pytest.mark.asyncio
+async def test_decode_token_without_exp_check_not_cached(token_service):
+    token = await token_service.create_token(data={"sub": "user_id"}, expires=datetime.now(timezone.utc) - timedelta(minutes=1))
+
+    decoded = await token_service.decode_token(token=token, verify_exp=False)
+
+    assert decoded["sub"] == "user_id"
+    assert len(token_service.cache) == 0
+
+
 """
 RegistrationService
 """
@@ -112,6 +152,46 @@ async def test_create_new_user(registration_service, mock_session, mock_reposito
     assert result == user_out
 
 
+@pytest.mark.asyncio
+async def test_create_new_user_duplicate_rejected_before_hashing(mock_repository, mock_session):
+    user_repository = AsyncMock(spec=UserRepository)
+    user_repository.stream_identities = MagicMock(return_value=async_chunks([("testname", "taken@email.com")]))
+    user_repository.find_taken.return_value = (True, False)
+    registration_service = RegistrationService(repository=mock_repository, hasher=AsyncMock(),
+                                               user_repository=user_repository)
+    await registration_service.warm_up(mock_session)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await registration_service.create_new_user(
+            user_in=UserIn(name="testname", email="email@email.com", password_hash="password"),
+            session=mock_session,
+        )
+
+    assert exc_info.value.status_code == 409
+    assert exc_info.value.detail == "User with the name already exists"
+    user_repository.find_taken.assert_awaited_once_with(mock_session, name="testname", email=None)
+    registration_service.hasher.hash.assert_not_called()
+    mock_repository.create_new_user.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_new_user_skips_query_for_unknown_values(mock_repository, mock_session):
+    user_repository = AsyncMock(spec=UserRepository)
+    user_repository.stream_identities = MagicMock(return_value=async_chunks([("testname", "taken@email.com")]))
+    registration_service = RegistrationService(repository=mock_repository, hasher=AsyncMock(),
+                                               user_repository=user_repository)
+    await registration_service.warm_up(mock_session)
+
+    await registration_service.create_new_user(
+        user_in=UserIn(name="newname", email="new@email.com", password_hash="password"),
+        session=mock_session,
+    )
+
+    user_repository.find_taken.assert_not_called()
+    mock_repository.create_new_user.assert_awaited_once()
+    assert "name:newname" in registration_service.known_users
+
+
 
 """
 AuthenticationService
@@ -197,3 +277,89 @@ async def test_save_refresh_token(authentication_service, mock_repository, mock_
     mock_repository.save_refresh_token.assert_called_once_with(token=refresh_token, session=mock_session)
 
 
+
+
+"""
+AuthorizationService
+"""
+
+USER_UUID = UUID("e16c5d2d-3959-476a-833e-6bbe720df2ef")
+
+
+def protected_auth_service(payload: dict, current_role=None, ttl: float = 30):
+    user_repository = AsyncMock(spec=UserRepository)
+    user_repository.get_role.return_value = current_role
+    auth_service = AsyncMock()
+    auth_service.decode_access_token.return_value = payload
+    auth_service.roles = RoleCache(user_repository, ttl=ttl)
+    return auth_service, user_repository
+
+
+@AuthorizationService.require_role("admin")
+async def admin_only(x_access_token, auth_service, session):
+    return "ok"
+
+
+@pytest.mark.asyncio
+async def test_require_role_trusts_claims(mock_session):
+    auth_service, user_repository = protected_auth_service(
+        {"sub": str(USER_UUID), "role": "superuser", "rv": 1}, ttl=0,
+    )
+
+    result = await admin_only(x_access_token="token", auth_service=auth_service, session=mock_session)
+
+    assert result == "ok"
+    user_repository.get_role.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_require_role_checks_role_version_once_per_ttl(mock_session):
+    auth_service, user_repository = protected_auth_service(
+        {"sub": str(USER_UUID), "role": "admin", "rv": 2}, current_role=(AccessLevel.admin, 2),
+    )
+
+    await admin_only(x_access_token="token", auth_service=auth_service, session=mock_session)
+    await admin_only(x_access_token="token", auth_service=auth_service, session=mock_session)
+
+    user_repository.get_role.assert_awaited_once_with(mock_session, USER_UUID)
+
+
+@pytest.mark.asyncio
+async def test_require_role_rejects_outdated_role_version(mock_session):
+    auth_service, _ = protected_auth_service(
+        {"sub": str(USER_UUID), "role": "admin", "rv": 1}, current_role=(AccessLevel.user, 2),
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await admin_only(x_access_token="token", auth_service=auth_service, session=mock_session)
+
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Token role is outdated"
+
+
+@pytest.mark.asyncio
+async def test_require_role_token_without_claims(mock_session):
+    auth_service, user_repository = protected_auth_service(
+        {"sub": str(USER_UUID)}, current_role=(AccessLevel.user, 1), ttl=0,
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await admin_only(x_access_token="token", auth_service=auth_service, session=mock_session)
+
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "not enough rights"
+    user_repository.get_role.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_access_token_with_role_claims(mock_repository, mock_session):
+    user_repository = AsyncMock(spec=UserRepository)
+    user_repository.get_role.return_value = (AccessLevel.admin, 3)
+    authentication_service = AuthenticationService(repository=mock_repository,
+                                                   roles=RoleCache(user_repository))
+
+    token = await authentication_service.create_access_token(data={"sub": USER_UUID}, session=mock_session)
+    payload = await authentication_service.decode_access_token(token)
+
+    assert payload["role"] == "admin"
+    assert payload["rv"] == 3
@@ -0,0 +1,31 @@
+from src.services import BloomFilter
+
+
+def test_bloom_filter_contains_added_values():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+
+    for i in range(1000):
+        bloom.add(f"user{i}")
+
+    assert all(f"user{i}" in bloom for i in range(1000))
+    assert len(bloom) == 1000
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"user{i}")
+
+    false_positives = sum(f"other{i}" in bloom for i in range(10000))
+
+    assert false_positives < 300
+
+
+def test_bloom_filter_clear():
+    bloom = BloomFilter(capacity=10)
+    bloom.add("user")
+
+    bloom.clear()
+
+    assert "user" not in bloom
+    assert len(bloom) == 0
@@ -0,0 +1,124 @@
+from unittest.mock import patch
+
+from src.services import LRUCache
+
+
+def test_cache_get_set():
+    cache = LRUCache(maxsize=2, ttl=60)
+
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=60)
+
+    cache.set(1, "one")
+    cache.set(2, "two")
+    cache.get(1)
+    cache.set(3, "three")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "one"
+    assert cache.get(3) == "three"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_ttl_expired():
+    cache = LRUCache(maxsize=2, ttl=10)
+
+    with patch("src.services.cache.monotonic", return_value=100.0):
+        cache.set("key", "value")
+
+    with patch("src.services.cache.monotonic", return_value=111.0):
+        assert cache.get("key") is None
+
+    assert len(cache) == 0
+
+
+def test_cache_invalidate():
+    cache = LRUCache(maxsize=2, ttl=60)
+
+    cache.set("key", "value")
+    cache.invalidate("key")
+
+    assert cache.get("key") is None
+
+
+def test_cache_set_skipped_after_invalidate():
+    cache = LRUCache(maxsize=1, ttl=60)
+
+    generation = cache.generation("key")
+    cache.invalidate("key")
+    cache.set("key", "stale", generation=generation)
+    assert cache.get("key") is None
+
+    generation = cache.generation("key")
+    cache.invalidate("other")
+    cache.clear()
+    cache.set("key", "stale", generation=generation)
+    assert cache.get("key") is None
+
+    cache.set("key", "fresh", generation=cache.generation("key"))
+    assert cache.get("key") == "fresh"
+
+
+def test_cache_disabled():
+    cache = LRUCache(maxsize=0, ttl=60)
+
+    cache.set("key", "value")
+
+    assert cache.get("key") is None
+
+
+def test_cache_evicts_by_size():
+    cache = LRUCache(maxsize=10, ttl=60, maxbytes=10)
+
+    cache.set(1, b"12345")
+    cache.set(2, b"12345")
+    cache.set(3, b"123")
+
+    assert cache.get(1) is None
+    assert cache.get(2) == b"12345"
+    assert cache.stats()["bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_skips_value_larger_than_maxbytes():
+    cache = LRUCache(maxsize=10, ttl=60, maxbytes=4)
+
+    cache.set("key", b"12345")
+
+    assert cache.get("key") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_cache_entry_ttl():
+    cache = LRUCache(maxsize=2, ttl=60)
+
+    with patch("src.services.cache.monotonic", return_value=100.0):
+        cache.set("short", "value", ttl=5)
+        cache.set("long", "value")
+
+    with patch("src.services.cache.monotonic", return_value=106.0):
+        assert cache.get("short") is None
+        assert cache.get("long") == "value"
+
+
+def test_cache_hold_after_invalidate():
+    cache = LRUCache(maxsize=2, ttl=60, hold=5)
+
+    with patch("src.services.cache.monotonic", return_value=100.0):
+        cache.invalidate("key")
+        cache.set("key", "stale")
+        cache.set("other", "value")
+        assert cache.get("key") is None
+        assert cache.get("other") == "value"
+
+    with patch("src.services.cache.monotonic", return_value=106.0):
+        cache.set("key", "fresh")
+        assert cache.get("key") == "fresh"
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from src.services import PasswordHasher
+
+fast_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(fast_context, workers=2, max_queue=1)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify(hasher):
+    password_hash = await hasher.hash("password")
+
+    assert await hasher.verify("password", password_hash)
+    assert not await hasher.verify("wrong", password_hash)
+    assert hasher.stats()["completed"] == 3
+    assert hasher.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_saturated(hasher):
+    release = threading.Event()
+    blocked = [asyncio.create_task(hasher._run(release.wait)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await hasher.hash("password")
+
+    release.set()
+    await asyncio.gather(*blocked)
+
+    assert exc_info.value.status_code == 503
+    assert int(exc_info.value.headers["Retry-After"]) >= 1
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_does_not_block_event_loop(hasher):
+    release = threading.Event()
+    task = asyncio.create_task(hasher._run(release.wait))
+    await asyncio.sleep(0.05)
+
+    stats = hasher.stats()
+    release.set()
+    await task
+
+    assert stats["running"] == 1
+    assert stats["queued"] == 0
@@ -0,0 +1,77 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt import InvalidKeyError
+from src.services import JWTKeys, TokenService, LRUCache
+
+
+def pem_pair(private_key) -> tuple[str, str]:
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    return private_pem, public_pem
+
+
+def make_config(algorithm: str, private_pem: str, public_pem: str) -> SimpleNamespace:
+    return SimpleNamespace(ALGORITHM=algorithm, PRIVATE_JWT=private_pem, PUBLIC_JWT=public_pem)
+
+
+def test_hs_secret_returned_as_is():
+    keys = JWTKeys(make_config("HS256", "secret", "secret"))
+
+    assert keys.signing_key() == "secret"
+    assert keys.verification_key() == "secret"
+    assert keys.loads == 0
+
+
+def test_keys_parsed_once():
+    config = make_config("EdDSA", *pem_pair(ed25519.Ed25519PrivateKey.generate()))
+    keys = JWTKeys(config)
+
+    signing_key = keys.signing_key()
+    verification_key = keys.verification_key()
+
+    assert isinstance(signing_key, ed25519.Ed25519PrivateKey)
+    assert isinstance(verification_key, ed25519.Ed25519PublicKey)
+    assert keys.signing_key() is signing_key
+    assert keys.verification_key() is verification_key
+    assert keys.loads == 2
+
+
+def test_keys_reloaded_when_config_changes():
+    config = make_config("EdDSA", *pem_pair(ed25519.Ed25519PrivateKey.generate()))
+    keys = JWTKeys(config)
+    first = keys.signing_key()
+
+    config.ALGORITHM = "RS256"
+    config.PRIVATE_JWT, config.PUBLIC_JWT = pem_pair(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+
+    assert isinstance(keys.signing_key(), rsa.RSAPrivateKey)
+    assert keys.signing_key() is not first
+    assert keys.loads == 2
+
+
+def test_invalid_pem_raises():
+    keys = JWTKeys(make_config("RS256", "not a key", "not a key"))
+
+    with pytest.raises(InvalidKeyError):
+        keys.load()
+
+
+@pytest.mark.asyncio
+async def test_token_roundtrip_eddsa():
+    keys = JWTKeys(make_config("EdDSA", *pem_pair(ed25519.Ed25519PrivateKey.generate())))
+    token_service = TokenService(cache=LRUCache(maxsize=0), keys=keys)
+
+    token = await token_service.create_token(
+        data={"sub": "user_id"}, expires=datetime.now(timezone.utc) + timedelta(minutes=15),
+    )
+    payload = await token_service.decode_token(token)
+
+    assert payload["sub"] == "user_id"
+    assert keys.loads == 2
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.services.ranking import ArticleRanking
+
+
+now = datetime(2025, 1, 26, 12, 0)
+
+
+def make_row(article_id, rating, created_at=now):
+    return SimpleNamespace(id=article_id, rating=rating, created_at=created_at)
+
+
+def test_ranking_top_orders_by_rating():
+    ranking = ArticleRanking(ttl=60)
+
+    ranking.load([make_row(1, 3.0), make_row(2, 5.0), make_row(3, 3.0)])
+
+    assert ranking.top(2) == [2, 3]
+    assert ranking.top(10) == [2, 3, 1]
+
+
+def test_ranking_trending_prefers_recent_articles():
+    ranking = ArticleRanking(ttl=60, trending_half_life=3600)
+
+    ranking.load([
+        make_row(1, 5.0, now - timedelta(days=1)),
+        make_row(2, 1.0, now),
+        make_row(3, 4.0, now),
+    ])
+
+    assert ranking.trending(3) == [3, 2, 1]
+
+
+def test_ranking_add_and_remove_keep_order():
+    ranking = ArticleRanking(ttl=60)
+    ranking.load([make_row(1, 1.0), make_row(2, 2.0)])
+
+    ranking.add(3, 4.0, now)
+    ranking.add(1, 5.0, now)
+    ranking.remove(2)
+    ranking.remove(42)
+
+    assert ranking.top(10) == [1, 3]
+    assert len(ranking) == 2
+
+
+def test_ranking_expires_after_ttl():
+    ranking = ArticleRanking(ttl=60)
+    assert ranking.expired
+
+    with patch("src.services.ranking.monotonic", return_value=100.0):
+        ranking.load([])
+    with patch("src.services.ranking.monotonic", return_value=150.0):
+        assert not ranking.expired
+    with patch("src.services.ranking.monotonic", return_value=161.0):
+        assert ranking.expired
+
+
+def test_ranking_replays_writes_made_during_load():
+    ranking = ArticleRanking(ttl=60)
+    ranking.load([make_row(1, 1.0), make_row(2, 2.0)])
+
+    ranking.begin_load()
+    ranking.add(3, 4.0, now)
+    ranking.add(1, 5.0, now)
+    ranking.remove(2)
+    ranking.load([make_row(1, 1.0), make_row(2, 2.0)])
+
+    assert ranking.top(10) == [1, 3]
+
+    ranking.add(4, 3.0, now)
+    ranking.load([make_row(1, 5.0), make_row(3, 4.0)])
+    assert ranking.top(10) == [1, 3]
+
+
+def test_ranking_cancel_load_stops_recording():
+    ranking = ArticleRanking(ttl=60)
+    ranking.begin_load()
+    ranking.cancel_load()
+
+    ranking.add(1, 1.0, now)
+    ranking.load([])
+
+    assert ranking.top(10) == []
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from src.services import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_singleflight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal started
+        started += 1
+        await release.wait()
+        return "value"
+
+    waiters = [asyncio.create_task(flight.do(1, load)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["value"] * 5
+    assert started == 1
+    assert flight.stats()["calls"] == 1
+    assert flight.stats()["coalesced"] == 4
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_singleflight_shares_exception():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        raise ValueError("boom")
+
+    waiters = [asyncio.create_task(flight.do(1, load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_singleflight_retries_after_leader_cancelled():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return "value"
+
+    leader = asyncio.create_task(flight.do(1, load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do(1, load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await follower == "value"
+    assert leader.cancelled()
+    assert flight.stats()["calls"] == 2
+
+
+@pytest.mark.asyncio
+async def test_singleflight_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def load():
+        return "value"
+
+    await asyncio.gather(flight.do(1, load), flight.do(2, load))
+
+    assert flight.stats()["calls"] == 2
+    assert flight.stats()["coalesced"] == 0